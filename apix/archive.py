@@ -0,0 +1,72 @@
+"""Archive an exploration's raw pages, so they can be re-parsed without the network."""
+import json
+from pathlib import Path
+import zipfile
+
+from loguru import logger
+
+
+class RawArchive:
+    """A compressed zip of the index page and every page fetched during an exploration
+
+    Pages are stored under generated names, and a json manifest maps each
+    crawled link to its page, alongside the host, base path and parser used.
+    """
+
+    MANIFEST = "manifest.json"
+    INDEX = "index"
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._zip = None
+        self._meta = {}
+
+    def start(self, host_url, base_path, parser, index_content):
+        """begin a new archive, holding the exploration's index page"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Archiving raw pages to {self.path}")
+        self._zip = zipfile.ZipFile(self.path, "w", compression=zipfile.ZIP_DEFLATED)
+        self._meta = {"host_url": host_url, "base_path": base_path, "parser": parser, "pages": []}
+        self._write(self.INDEX, index_content)
+
+    def _write(self, name, content):
+        """write bytes, or stream a file spooled to disk, into the archive"""
+        if isinstance(content, Path):
+            self._zip.write(content, name)
+        else:
+            self._zip.writestr(name, content)
+
+    def add(self, link, content):
+        """archive a crawled page, if the archive is being written"""
+        if not self._zip:
+            return
+        name = f"pages/{len(self._meta['pages'])}"
+        self._write(name, content)
+        self._meta["pages"].append([list(link), name])
+
+    def finish(self):
+        """write the manifest, completing the archive"""
+        if self._zip:
+            self._zip.writestr(self.MANIFEST, json.dumps(self._meta))
+            self._zip.close()
+            self._zip = None
+
+    def open(self):
+        """open a completed archive for reading, returning its manifest"""
+        self._zip = zipfile.ZipFile(self.path)
+        self._meta = json.loads(self._zip.read(self.MANIFEST))
+        return self._meta
+
+    def index(self):
+        """return the archived index page"""
+        return self._zip.read(self.INDEX)
+
+    def pages(self):
+        """yield each archived (link, content) pair, reading one page at a time"""
+        for link, name in self._meta["pages"]:
+            yield tuple(link), self._zip.read(name)
+
+    def close(self):
+        if self._zip:
+            self._zip.close()
+            self._zip = None
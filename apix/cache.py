@@ -0,0 +1,116 @@
+"""Keep explored responses on disk, so later explorations can make conditional requests."""
+import hashlib
+import json
+from pathlib import Path
+import shutil
+
+from loguru import logger
+
+
+def _file_hash(path):
+    """hash a file in chunks, without reading it into memory at once"""
+    digest = hashlib.sha256()
+    with path.open("rb") as body:
+        while chunk := body.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """A persistent, url-keyed store of response bodies and their validators
+
+    Each url gets a small json metadata file holding its ETag, Last-Modified,
+    body hash and any scrape results, next to a file holding the raw body.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+
+    def _paths(self, url):
+        """return the metadata and body paths for a url"""
+        key = hashlib.sha256(url.encode()).hexdigest()
+        base = self.cache_dir / key[:2] / key
+        return base.with_suffix(".json"), base.with_suffix(".body")
+
+    def get(self, url):
+        """return the stored metadata for a url, if there is any"""
+        meta_path, _ = self._paths(url)
+        if not meta_path.exists():
+            return None
+        try:
+            return json.loads(meta_path.read_text())
+        except ValueError:
+            logger.warning(f"Ignoring corrupt cache entry {meta_path}")
+            return None
+
+    def discard(self, url):
+        """forget everything stored for a url"""
+        for path in self._paths(url):
+            path.unlink(missing_ok=True)
+
+    def conditional_headers(self, url):
+        """build the headers that let the host answer 304 for an unchanged url"""
+        entry = self.get(url) or {}
+        if not self._paths(url)[1].exists():
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def load_body(self, url, spool_threshold=None):
+        """return the stored body for a url, if it is still intact
+        bodies larger than spool_threshold bytes are returned as the Path of their file
+        """
+        entry = self.get(url)
+        _, body_path = self._paths(url)
+        if not entry or not body_path.exists():
+            return None
+        if spool_threshold and body_path.stat().st_size > spool_threshold:
+            body, body_hash = body_path, _file_hash(body_path)
+        else:
+            body = body_path.read_bytes()
+            body_hash = hashlib.sha256(body).hexdigest()
+        if body_hash != entry["body_hash"]:
+            logger.warning(f"Cached body for {url} doesn't match its hash. Discarding.")
+            self.discard(url)
+            return None
+        return body
+
+    def store(self, url, headers, body):
+        """store a fresh response, dropping any scrape results of the old body
+        body is either bytes or the Path of a body spooled to disk
+        """
+        meta_path, body_path = self._paths(url)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(body, Path):
+            shutil.copyfile(body, body_path)
+            body_hash = _file_hash(body_path)
+        else:
+            body_path.write_bytes(body)
+            body_hash = hashlib.sha256(body).hexdigest()
+        entry = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "body_hash": body_hash,
+            "scraped": {},
+        }
+        meta_path.write_text(json.dumps(entry))
+
+    def scraped(self, url, parser_name):
+        """return a stored scrape result of a url's body by the named parser"""
+        entry = self.get(url) or {}
+        return entry.get("scraped", {}).get(parser_name)
+
+    def store_scraped(self, url, parser_name, result):
+        """remember what the named parser scraped from a url's stored body"""
+        entry = self.get(url)
+        if not entry:
+            return
+        entry["scraped"][parser_name] = result
+        meta_path, _ = self._paths(url)
+        meta_path.write_text(json.dumps(entry))
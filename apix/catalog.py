@@ -0,0 +1,225 @@
+"""Index explored apis, their versions and contents in a sqlite catalog."""
+from contextlib import closing, contextmanager
+from pathlib import Path
+import sqlite3
+import time
+
+from apix.params import PARAM_KEYS, Param
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+CREATE TABLE IF NOT EXISTS apis (name TEXT PRIMARY KEY, mtime REAL, dir_mtime INTEGER);
+CREATE TABLE IF NOT EXISTS versions (
+    api TEXT, version TEXT, indexed INTEGER DEFAULT 0, PRIMARY KEY (api, version)
+);
+CREATE TABLE IF NOT EXISTS entities (api TEXT, version TEXT, entity TEXT);
+CREATE TABLE IF NOT EXISTS methods (api TEXT, version TEXT, entity TEXT, method TEXT);
+CREATE TABLE IF NOT EXISTS paths (api TEXT, version TEXT, entity TEXT, method TEXT, path TEXT);
+CREATE TABLE IF NOT EXISTS params (
+    api TEXT, version TEXT, entity TEXT, method TEXT, param TEXT, name TEXT
+);
+CREATE TABLE IF NOT EXISTS diffs (
+    api TEXT, ver1 TEXT, ver2 TEXT, path TEXT, PRIMARY KEY (api, ver1, ver2)
+);
+CREATE INDEX IF NOT EXISTS entities_version ON entities (api, version);
+CREATE INDEX IF NOT EXISTS methods_version ON methods (api, version);
+CREATE INDEX IF NOT EXISTS paths_version ON paths (api, version);
+CREATE INDEX IF NOT EXISTS params_version ON params (api, version);
+CREATE INDEX IF NOT EXISTS params_name ON params (name);
+"""
+
+CONTENT_TABLES = ("entities", "methods", "paths", "params")
+# the coarsest timestamp granularity a listing's mtime is trusted at, as on FAT or NFS
+MTIME_GRANULARITY = 2 * 10**9
+# what each kind of search matches against
+SEARCH_COLUMNS = {
+    "entity": ("entities", "entity"),
+    "method": ("methods", "method"),
+    "path": ("paths", "path"),
+    "param": ("params", "param"),
+}
+
+
+def _content_rows(api, version, data):
+    """Yield (table, row) pairs for the entities, methods, paths and params of a version"""
+    for entity, body in (data or {}).items():
+        yield "entities", (api, version, entity)
+        methods = body.get("methods") if isinstance(body, dict) else None
+        for method in methods or []:
+            # compact versions only hold method names
+            items = method.items() if isinstance(method, dict) else [(method, {})]
+            for name, details in items:
+                yield "methods", (api, version, entity, str(name))
+                found = details if isinstance(details, dict) else {}
+                for path in found.get("paths") or []:
+                    yield "paths", (api, version, entity, str(name), str(path))
+                params = next((found[key] for key in PARAM_KEYS if found.get(key)), [])
+                for param in params:
+                    param_name = Param.parse(str(param)).name
+                    yield "params", (api, version, entity, str(name), str(param), param_name)
+
+
+class Catalog:
+    """A sqlite index of the apis and versions saved under an APIs directory
+
+    Listings are validated against the modification time of the directory they
+    were read from, so they are only re-scanned when files are added or removed.
+    A file added within the same timestamp tick as a scan wouldn't change that mtime,
+    so listings of directories changed within MTIME_GRANULARITY are always re-scanned.
+    Version contents are indexed when saved, or lazily before they're searched.
+    """
+
+    def __init__(self, api_root):
+        self.api_root = Path(api_root)
+        # kept outside of api_root, so that writing it doesn't change api_root's mtime
+        self.path = self.api_root.parent / "apix-catalog.sqlite"
+
+    @contextmanager
+    def _connect(self):
+        """open the catalog in a transaction, creating it if needed"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            conn.executescript(SCHEMA)
+            with conn:
+                yield conn
+
+    @staticmethod
+    def _settled(mtime):
+        """return a directory's mtime in ns if it's old enough to validate a listing"""
+        return mtime if time.time_ns() - mtime >= MTIME_GRANULARITY else None
+
+    def apis(self, root_mtime):
+        """return the cataloged apis, most recently updated first, or None if stale"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'root_mtime'").fetchone()
+            if not row or row[0] != root_mtime:
+                return None
+            return [name for (name,) in conn.execute("SELECT name FROM apis ORDER BY mtime DESC")]
+
+    def set_apis(self, root_mtime, apis):
+        """replace the cataloged apis with a fresh scan of {name: mtime}"""
+        with self._connect() as conn:
+            for (name,) in conn.execute("SELECT name FROM apis").fetchall():
+                if name not in apis:
+                    self._forget(conn, name)
+            conn.executemany(
+                "INSERT INTO apis (name, mtime) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET mtime = excluded.mtime",
+                apis.items(),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('root_mtime', ?)",
+                (self._settled(root_mtime),),
+            )
+        return sorted(apis, key=apis.get, reverse=True)
+
+    def versions(self, api, dir_mtime):
+        """return the cataloged versions of an api, or None if stale"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT dir_mtime FROM apis WHERE name = ?", (api,)).fetchone()
+            if not row or row[0] != dir_mtime:
+                return None
+            rows = conn.execute("SELECT version FROM versions WHERE api = ?", (api,))
+            return [version for (version,) in rows]
+
+    def set_versions(self, api, dir_mtime, versions):
+        """replace an api's cataloged versions with a fresh scan, keeping their indexes"""
+        with self._connect() as conn:
+            for (version,) in conn.execute(
+                "SELECT version FROM versions WHERE api = ?", (api,)
+            ).fetchall():
+                if version not in versions:
+                    self._forget(conn, api, version)
+            conn.executemany(
+                "INSERT OR IGNORE INTO versions (api, version) VALUES (?, ?)",
+                [(api, version) for version in versions],
+            )
+            conn.execute(
+                "INSERT INTO apis (name, mtime, dir_mtime) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET dir_mtime = excluded.dir_mtime",
+                (api, time.time(), self._settled(dir_mtime)),
+            )
+
+    @staticmethod
+    def _forget(conn, api, version=None):
+        """remove an api, or one of its versions, and everything indexed for it"""
+        where, args = "api = ?", (api,)
+        if version:
+            where, args = "api = ? AND version = ?", (api, version)
+        for table in (*CONTENT_TABLES, "versions"):
+            conn.execute(f"DELETE FROM {table} WHERE {where}", args)
+        if not version:
+            conn.execute("DELETE FROM diffs WHERE api = ?", (api,))
+            conn.execute("DELETE FROM apis WHERE name = ?", (api,))
+
+    def record_version(self, api, version, data):
+        """catalog a newly saved version, indexing its contents"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO apis (name, mtime) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET mtime = excluded.mtime",
+                (api, time.time()),
+            )
+            self._index(conn, api, version, data)
+
+    def index_version(self, api, version, data):
+        """index the contents of an already cataloged version"""
+        with self._connect() as conn:
+            self._index(conn, api, version, data)
+
+    @staticmethod
+    def _index(conn, api, version, data):
+        for table in CONTENT_TABLES:
+            conn.execute(f"DELETE FROM {table} WHERE api = ? AND version = ?", (api, version))
+        rows = {table: [] for table in CONTENT_TABLES}
+        for table, row in _content_rows(api, version, data):
+            rows[table].append(row)
+        for table, table_rows in rows.items():
+            if table_rows:
+                marks = ", ".join("?" * len(table_rows[0]))
+                conn.executemany(f"INSERT INTO {table} VALUES ({marks})", table_rows)
+        conn.execute(
+            "INSERT INTO versions (api, version, indexed) VALUES (?, ?, 1) "
+            "ON CONFLICT (api, version) DO UPDATE SET indexed = 1",
+            (api, version),
+        )
+
+    def unindexed(self, api=None):
+        """return the (api, version) pairs whose contents haven't been indexed yet"""
+        query = "SELECT api, version FROM versions WHERE indexed = 0"
+        with self._connect() as conn:
+            if api:
+                return conn.execute(f"{query} AND api = ?", (api,)).fetchall()
+            return conn.execute(query).fetchall()
+
+    def record_diff(self, api, ver1, ver2, path):
+        """catalog a saved diff between two versions"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO diffs VALUES (?, ?, ?, ?)", (api, ver1, ver2, path)
+            )
+
+    def diffs(self, api):
+        """return the (ver1, ver2, path) of each cataloged diff of an api"""
+        with self._connect() as conn:
+            query = "SELECT ver1, ver2, path FROM diffs WHERE api = ? ORDER BY ver1 DESC"
+            return conn.execute(query, (api,)).fetchall()
+
+    def search(self, kind, text, api=None):
+        """find the (api, version, entity, method, match) rows whose `kind` contains text
+        kind is one of entity, method, path or param
+        """
+        table, column = SEARCH_COLUMNS[kind]
+        method = "NULL" if kind == "entity" else "method"
+        query = (
+            f"SELECT api, version, entity, {method}, {column} FROM {table} "
+            f"WHERE {column} LIKE ? ESCAPE '\\'"
+        )
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        args = [pattern]
+        if api:
+            query += " AND api = ?"
+            args.append(api)
+        query += " ORDER BY 1, 2 DESC, 3, 4"
+        with self._connect() as conn:
+            return conn.execute(query, args).fetchall()
@@ -1,12 +1,15 @@
 """Main module for apix's interface."""
+from contextlib import nullcontext
+
 from rich import print
 from rich.table import Table
 import rich_click as click
 
 from apix import helpers, logger
 from apix.diff import VersionDiff
-from apix.explore import AsyncExplorer
+from apix.explore import AsyncExplorer, explore_manifest
 from apix.libtools.libmaker import LibMaker
+from apix.progress import progress_display
 
 
 def _version():
@@ -36,14 +39,14 @@ def cli():
     "-n",
     "--api-name",
     type=str,
-    required=True,
+    default=None,
     help="The name of the API (satellite).",
 )
 @click.option(
     "-u",
     "--host-url",
     type=str,
-    required=True,
+    default=None,
     help="The url for the API's host (http://my.host.domain/).",
 )
 @click.option(
@@ -78,20 +81,253 @@ def cli():
     is_flag=True,
     help="Strip all the extra information from the saved data.",
 )
+@click.option(
+    "--max-concurrency",
+    type=click.IntRange(min=1),
+    default=20,
+    help="The maximum number of requests in flight at once (20).",
+)
+@click.option(
+    "--max-per-host",
+    type=click.IntRange(min=1),
+    default=None,
+    help="The maximum number of open connections to a single host.",
+)
+@click.option(
+    "--adaptive",
+    is_flag=True,
+    help="Raise or lower in-flight requests based on the host's latency and errors.",
+)
+@click.option(
+    "--retries",
+    type=click.IntRange(min=0),
+    default=3,
+    help="How many times to retry a single link after a timeout, disconnect or 5xx (3).",
+)
+@click.option(
+    "--retry-budget",
+    type=click.IntRange(min=0),
+    default=100,
+    help="The maximum number of retries spent across the whole exploration (100).",
+)
+@click.option(
+    "--parse-workers",
+    type=click.IntRange(min=0),
+    default=0,
+    help="Parse pages in this many worker processes, instead of the main process.",
+)
+@click.option(
+    "--parse-chunk-size",
+    type=click.IntRange(min=1),
+    default=16,
+    help="How many pages to send to a parsing worker at once (16).",
+)
+@click.option(
+    "--cache",
+    is_flag=True,
+    help="Keep responses under the data directory and only re-download changed pages.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Reuse resources that haven't changed since the latest saved version.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue an interrupted exploration of the same version, visiting pending links only.",
+)
+@click.option(
+    "--stream-parse",
+    is_flag=True,
+    help="Parse the apipie json document one resource at a time, to save memory.",
+)
+@click.option(
+    "--connect-timeout",
+    type=click.FloatRange(min=0),
+    default=30,
+    help="Seconds to wait for a connection to the host (30).",
+)
+@click.option(
+    "--read-timeout",
+    type=click.FloatRange(min=0),
+    default=300,
+    help="Seconds to wait for a response to send more data (300).",
+)
+@click.option(
+    "--manifest",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="A yaml file of targets (name, host_url, base_path, version, parser) to explore.",
+)
+@click.option(
+    "--archive",
+    is_flag=True,
+    help="Keep a compressed archive of the raw pages, for use with reparse.",
+)
+@click.option(
+    "--request-deadline",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Seconds a single request may take in total before it is retried or given up on.",
+)
+@click.option(
+    "--hedge",
+    is_flag=True,
+    help="Send a second request for any page slower than the p95 latency, using the first answer.",
+)
+@click.option(
+    "--spool-threshold",
+    type=click.FloatRange(min=0),
+    default=8,
+    help="Spool responses larger than this many MiB to temporary files, 0 to never spool (8).",
+)
+@click.option(
+    "--progress",
+    is_flag=True,
+    help="Show live progress and throughput of the crawl.",
+)
+@click.option(
+    "--summary",
+    is_flag=True,
+    help="Save a json summary of the exploration next to the saved version.",
+)
+@click.option(
+    "--storage",
+    type=click.Choice(list(helpers.STORAGE_FORMATS)),
+    default=helpers.DEFAULT_FORMAT,
+    help=f"The storage format to save the version in ({helpers.DEFAULT_FORMAT}).",
+)
+@click.option(
+    "--compress",
+    type=click.Choice(list(helpers.COMPRESSIONS)),
+    default=None,
+    help="Compress the saved version as it's written.",
+)
+# (too-many-arguments)
+def explore(
+    api_name,
+    host_url,
+    base_path,
+    version,
+    parser,
+    data_dir,
+    compact,
+    max_concurrency,
+    max_per_host,
+    adaptive,
+    retries,
+    retry_budget,
+    parse_workers,
+    parse_chunk_size,
+    cache,
+    incremental,
+    resume,
+    stream_parse,
+    connect_timeout,
+    read_timeout,
+    manifest,
+    archive,
+    request_deadline,
+    hedge,
+    spool_threshold,
+    progress,
+    summary,
+    storage,
+    compress,
+):
+    """Explore a target API, or every target in a manifest, and export the findings"""
+    options = {
+        "base_path": base_path,
+        "parser": parser,
+        "data_dir": data_dir,
+        "compact": compact,
+        "max_concurrency": max_concurrency,
+        "max_per_host": max_per_host,
+        "adaptive": adaptive,
+        "max_retries": retries,
+        "retry_budget": retry_budget,
+        "parse_workers": parse_workers,
+        "parse_chunk_size": parse_chunk_size,
+        "cache": cache,
+        "incremental": incremental,
+        "resume": resume,
+        "stream_parse": stream_parse,
+        "connect_timeout": connect_timeout,
+        "read_timeout": read_timeout,
+        "archive": archive,
+        "request_deadline": request_deadline,
+        "hedge": hedge,
+        "spool_threshold": int(spool_threshold * (1 << 20)),
+        "summary": summary,
+        "storage": storage,
+        "compress": compress,
+    }
+    if not manifest and (not api_name or not host_url):
+        raise click.UsageError("--api-name and --host-url are required without --manifest.")
+    display = progress_display() if progress else None
+    with display or nullcontext():
+        options["progress"] = display
+        if manifest:
+            explore_manifest(manifest, **options)
+            return
+        explorer = AsyncExplorer(name=api_name, version=version, host_url=host_url, **options)
+        explorer.explore()
+        explorer.save_data()
+
+
+@cli.command()
+@click.option(
+    "-n",
+    "--api-name",
+    type=str,
+    required=True,
+    help="The name of the API (satellite).",
+)
+@click.option(
+    "-v",
+    "--version",
+    type=str,
+    required=True,
+    help="The archived API version to re-parse (6.3).",
+)
+@click.option(
+    "-p",
+    "--parser",
+    type=str,
+    default=None,
+    help="The name of the parser to use on the archived pages (the archived parser).",
+)
+@click.option(
+    "--data-dir",
+    type=str,
+    default="./",
+    help="The base directory holding the archive, where the results are also saved.",
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Strip all the extra information from the saved data.",
+)
+@click.option(
+    "--parse-workers",
+    type=click.IntRange(min=0),
+    default=0,
+    help="Parse pages in this many worker processes, instead of the main process.",
+)
 # (too-many-arguments)
-def explore(api_name, host_url, base_path, version, parser, data_dir, compact):
-    """Explore a target API and export the findings"""
+def reparse(api_name, version, parser, data_dir, compact, parse_workers):
+    """Re-parse the raw pages archived by an earlier exploration, without the network"""
     explorer = AsyncExplorer(
         name=api_name,
         version=version,
-        host_url=host_url,
-        base_path=base_path,
         parser=parser,
         data_dir=data_dir,
         compact=compact,
+        parse_workers=parse_workers,
     )
-    explorer.explore()
-    explorer.save_data()
+    if explorer.reparse():
+        explorer.save_data()
 
 
 @cli.command()
@@ -127,7 +363,14 @@ def explore(api_name, host_url, base_path, version, parser, data_dir, compact):
     is_flag=True,
     help="Strip all the extra information from the saved data.",
 )
-def diff(api_name, latest_version, previous_version, data_dir, compact):
+@click.option(
+    "--compress",
+    type=click.Choice(list(helpers.COMPRESSIONS)),
+    default=None,
+    help="Compress the saved diff as it's written.",
+)
+# (too-many-arguments)
+def diff(api_name, latest_version, previous_version, data_dir, compact, compress):
     """Determine the changes between two API versions"""
     vdiff = VersionDiff(
         api_name=api_name,
@@ -135,6 +378,7 @@ def diff(api_name, latest_version, previous_version, data_dir, compact):
         ver2=previous_version,
         data_dir=data_dir,
         compact=compact,
+        compress=compress,
     )
     vdiff.diff()
     vdiff.save_diff()
@@ -171,6 +415,50 @@ def compact(api_name, version, data_dir):
     helpers.save_api(api_name, version, api_data, data_dir, True)
 
 
+@cli.command()
+@click.option(
+    "-n",
+    "--api-name",
+    type=str,
+    required=True,
+    help="The name of the API (satellite6).",
+)
+@click.option(
+    "-v",
+    "--version",
+    type=str,
+    required=True,
+    help="The saved API version to convert (6.3).",
+)
+@click.option(
+    "-f",
+    "--format",
+    "fmt",
+    type=click.Choice(list(helpers.STORAGE_FORMATS)),
+    default="yaml",
+    help="The storage format to convert the version to (yaml).",
+)
+@click.option(
+    "--compress",
+    type=click.Choice(list(helpers.COMPRESSIONS)),
+    default=None,
+    help="Compress the saved version as it's written.",
+)
+@click.option(
+    "--data-dir",
+    type=str,
+    default="./",
+    help="The base directory holding the saved versions.",
+)
+def convert(api_name, version, fmt, compress, data_dir):
+    """Convert a saved API version to another storage format, such as yaml for interchange"""
+    api_data = helpers.load_api(api_name, version, data_dir)
+    if not api_data:
+        print(f"Unable to find {api_name} v{version} in {data_dir}")
+        return
+    helpers.save_api(api_name, version, api_data, data_dir, fmt=fmt, compress=compress)
+
+
 @cli.command()
 @click.option(
     "-n",
@@ -211,7 +499,7 @@ def makelib(api_name, version, template, data_dir):
 
 
 @cli.command()
-@click.argument("subject", type=click.Choice(["apis", "versions"]))
+@click.argument("subject", type=click.Choice(["apis", "versions", "diffs"]))
 @click.option(
     "-n",
     "--api-name",
@@ -247,6 +535,49 @@ def list(subject, api_name, data_dir):
             print(table)
         else:
             print(f"Unable to find saved versions for {api_name} in {data_dir}")
+    elif subject == "diffs" and api_name:
+        diff_list = helpers.get_catalog(data_dir).diffs(api_name)
+        if diff_list:
+            table = Table(title=f"Saved Diffs for {api_name}")
+            table.add_column("Latest Version", style="cyan")
+            table.add_column("Previous Version", style="cyan")
+            table.add_column("File")
+            for ver1, ver2, path in diff_list:
+                table.add_row(ver2, ver1, path)
+            print(table)
+        else:
+            print(f"Unable to find saved diffs for {api_name} in {data_dir}")
+
+
+@cli.command()
+@click.argument("kind", type=click.Choice(["entity", "method", "path", "param"]))
+@click.argument("text", type=str)
+@click.option(
+    "-n",
+    "--api-name",
+    type=str,
+    default=None,
+    help="Only search this API's versions (satellite6).",
+)
+@click.option(
+    "--data-dir",
+    type=str,
+    default="./",
+    help="The base directory holding the saved versions.",
+)
+def search(kind, text, api_name, data_dir):
+    """Find the saved versions with an entity, method, path or param containing TEXT"""
+    catalog = helpers.index_catalog(api_name, data_dir)
+    results = catalog.search(kind, text, api_name)
+    if not results:
+        print(f"Unable to find a {kind} matching {text!r} in {data_dir}")
+        return
+    table = Table(title=f"Versions with a {kind} matching {text!r}")
+    for column in ("API Name", "Version", "Entity", "Method", kind.title()):
+        table.add_column(column, style="cyan" if column == "Version" else None)
+    for row in results:
+        table.add_row(*(value or "" for value in row))
+    print(table)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,74 @@
 """Determine the changes between two API versions."""
+from collections.abc import Hashable
 from pathlib import Path
 
 from loguru import logger
-import yaml
 
-from apix.helpers import get_latest, get_previous, load_api
+from apix.helpers import (
+    YAMLStorage,
+    compressed_path,
+    get_catalog,
+    get_latest,
+    get_previous,
+    load_api,
+    stored_paths,
+)
+from apix.params import Param, unparse_params
+
+
+class _ListIndex:
+    """Indexes of a list's items by dict key, param name and value, each built on first use
+
+    Lookups return matches in list order, so matching against an index gives
+    the same results as scanning the list for each item, without the scans.
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self._keys = self._others = self._names = self._values = None
+
+    def with_key(self, key):
+        """return the items that contain key"""
+        if self._keys is None:
+            self._keys, self._others = {}, []
+            for pos, item in enumerate(self.items):
+                if isinstance(item, dict):
+                    for item_key in item:
+                        self._keys.setdefault(item_key, []).append(pos)
+                else:
+                    self._others.append(pos)
+        positions = self._keys.get(key, [])
+        if self._others:
+            # anything but a dict still has to be checked for containment
+            found = [pos for pos in self._others if key in self.items[pos]]
+            positions = sorted(positions + found)
+        return [self.items[pos] for pos in positions]
+
+    def named(self, name):
+        """return the params with the given name"""
+        if self._names is None:
+            self._names = {}
+            for item in self.items:
+                self._names.setdefault(Param.parse(item).name, []).append(item)
+        return self._names.get(name, [])
+
+    def __contains__(self, value):
+        if self._values is None:
+            # an unhashable dict or list never equals the strings looked up here
+            self._values = {item for item in self.items if isinstance(item, Hashable)}
+        return value in self._values
 
 
 class VersionDiff:
     def __init__(
-        self, api_name=None, ver1=None, ver2=None, data_dir=None, compact=False, mock=False
+        self,
+        api_name=None,
+        ver1=None,
+        ver2=None,
+        data_dir=None,
+        compact=False,
+        mock=False,
+        compress=None,
     ):
         self.api_name = api_name
         self.ver1 = ver1
@@ -17,6 +76,7 @@ class VersionDiff:
         self.data_dir = data_dir
         self.compact = compact
         self.mock = mock
+        self.compress = compress
         self._vdiff = {}
         self.__attrs_post_init__()
 
@@ -66,50 +126,50 @@ class VersionDiff:
                         added[key] = values
             else:
                 logger.debug(f"Adding {key} => {values}")
-                added[key] = values
+                added[key] = unparse_params(values)
         return added, changed
 
     def _list_diff(self, list1, list2):  # noqa: PLR0912 (allowing for deep nesting)
-        """Recursively search a list for differences"""
+        """Recursively search a list for differences
+        list2 is indexed as it's needed, so each item is matched without scanning it
+        """
         added, changed = [], []
         if list1 == list2:
             return added, changed
+        index = _ListIndex(list2)
         for item in list1:
             if isinstance(item, dict):
                 found = False
                 for key in item:
-                    for i, needle in enumerate(list2):
-                        if key in needle:
-                            found = True
-                            res, chng = self._dict_diff(item, list2[i])
-                            if res:
-                                added.append(res)
-                            if chng:
-                                changed.append(chng)
+                    for needle in index.with_key(key):
+                        found = True
+                        res, chng = self._dict_diff(item, needle)
+                        if res:
+                            added.append(res)
+                        if chng:
+                            changed.append(chng)
                 if not found:
-                    logger.debug(f"Adding {item}")
-                    added.append(item)
+                    logger.debug("Adding {}", item)
+                    added.append(unparse_params(item))
             elif isinstance(item, list):
                 res, chng = self._list_diff(item, list2[list2.index(item)])
                 if res:
                     added.append(res)
                 if chng:
                     changed.append(chng)
-            elif " ~ " in item:
-                name = item.split("~")[0].strip()
+            elif " ~ " in str(item):
                 found = False
-                for needle in list2:
-                    # look for matching names
-                    if name == needle.split("~")[0].strip():
-                        found = True
-                        if item != needle:
-                            logger.debug(f"{item} changed to {needle}")
-                            changed.append(item)
+                # look for matching names
+                for needle in index.named(Param.parse(item).name):
+                    found = True
+                    if item != needle:
+                        logger.debug("{} changed to {}", item, needle)
+                        changed.append(str(item))
                 if not found:
-                    logger.debug(f"Adding {item}")
-                    added.append(item)
-            elif item not in list2:
-                logger.debug(f"Adding {item}")
+                    logger.debug("Adding {}", item)
+                    added.append(str(item))
+            elif item not in index:
+                logger.debug("Adding {}", item)
                 added.append(item)
         return added, changed
 
@@ -157,13 +217,20 @@ class VersionDiff:
             fpath = Path(
                 f"{self.data_dir}APIs/{self.api_name}/{self.ver2}-to-{self.ver1}-{ftype}.yaml"
             )
-        if fpath.exists():
-            fpath.unlink()
+        stored = stored_paths(fpath)
+        fpath = compressed_path(fpath, self.compress)
         # create the directory, if it doesn't exist
         fpath.parent.mkdir(parents=True, exist_ok=True)
-        fpath.touch()
         logger.info(f"Saving results to {fpath}")
-        with fpath.open("w+") as outfile:
-            yaml.dump(self._vdiff, outfile, default_flow_style=False)
+        # diffs are read by people, so they are always saved as yaml.
+        # the previous diff is replaced atomically, once the new one is written
+        # one entity at a time, from within each of the diff's sections
+        YAMLStorage.dump(self._vdiff, fpath, depth=1)
+        for s_path in stored:
+            if s_path != fpath:
+                s_path.unlink(missing_ok=True)
+        get_catalog(self.data_dir, self.mock).record_diff(
+            self.api_name, self.ver2, self.ver1, str(fpath)
+        )
         if return_path:
             return fpath
@@ -1,14 +1,178 @@
 """Explore and API and save the results."""
 import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import functools
+from http import HTTPStatus
+import inspect
+import json
 from pathlib import Path
+import random
+import tempfile
 import time
 
 import aiohttp
 from loguru import logger
-import requests
 import yaml
 
-from apix.parsers import apipie, test
+from apix import helpers
+from apix.archive import RawArchive
+from apix.cache import ResponseCache
+from apix.journal import CrawlJournal
+from apix.parsers import apipie, apipie_old, test
+from apix.progress import CrawlStats
+
+PARSERS = {
+    "apipie": apipie.APIPie,
+    "apipie-resources": apipie.APIPieResources,
+    "apipie-old": apipie_old.OldAPIPie,
+    "test": test.TestParser,
+}
+
+
+def _scrape_chunk(scrape_content, chunk):
+    """scrape a chunk of (link, content) pairs inside a parsing worker process
+    returns the seconds spent scraping, along with the results
+    """
+    start = time.perf_counter()
+    scraped = [(link, scrape_content(content)) for link, content in chunk]
+    return time.perf_counter() - start, scraped
+
+
+def _chunked(pages, size):
+    """group an iterable of pages into lists of up to `size` pages"""
+    chunk = []
+    for page in pages:
+        chunk.append(page)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ConcurrencyLimiter:
+    """Cap the number of in-flight requests, optionally adapting the cap to the host
+
+    In adaptive mode the limit starts at half of max_limit and is re-evaluated after
+    every window of `limit` responses: it grows by one while latency stays close to
+    the best latency seen, shrinks by one when latency drifts past latency_factor
+    times that, and is halved immediately when a request fails in a retryable way.
+    Other error statuses, like a dead link's 404, count as ordinary responses.
+    """
+
+    def __init__(self, max_limit=20, adaptive=False, min_limit=1, latency_factor=2.0):
+        self.max_limit = max(max_limit, min_limit)
+        self.min_limit = min_limit
+        self.adaptive = adaptive
+        self.latency_factor = latency_factor
+        self.limit = max(self.max_limit // 2, min_limit) if adaptive else self.max_limit
+        self._in_flight = 0
+        self._window = 0
+        self._best = None
+        self._ewma = None
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        """wait until there is room for another request"""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def release(self, latency=None, failed=False):
+        """free a slot, feeding the request's outcome to the adaptive limit"""
+        async with self._cond:
+            self._in_flight -= 1
+            if self.adaptive:
+                self._adapt(latency, failed)
+            self._cond.notify_all()
+
+    def _adapt(self, latency, failed):
+        """adjust the limit from a single response's latency and error state"""
+        old_limit = self.limit
+        if failed:
+            self.limit = max(self.limit // 2, self.min_limit)
+            self._window = 0
+        elif latency is not None:
+            self._best = latency if self._best is None else min(self._best, latency)
+            self._ewma = latency if self._ewma is None else 0.8 * self._ewma + 0.2 * latency
+            self._window += 1
+            if self._window >= self.limit:
+                self._window = 0
+                if self._ewma > self._best * self.latency_factor:
+                    self.limit = max(self.limit - 1, self.min_limit)
+                else:
+                    self.limit = min(self.limit + 1, self.max_limit)
+        if self.limit != old_limit:
+            logger.debug(f"Concurrency limit {old_limit} -> {self.limit}")
+
+
+class RetryPolicy:
+    """Decide whether, and how long after, a failed request should be retried
+
+    Each link gets up to max_retries extra attempts, spaced by exponential backoff
+    with full jitter. The budget caps the retries spent across the whole crawl,
+    so a host that is going down can't stall an exploration indefinitely.
+    """
+
+    def __init__(self, max_retries=3, budget=100, base_delay=1.0, max_delay=30.0):
+        self.max_retries = max_retries
+        self.budget = budget
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.spent = 0
+
+    @staticmethod
+    def retryable_status(status):
+        """server errors and throttling are worth another try, other statuses aren't"""
+        return status >= HTTPStatus.INTERNAL_SERVER_ERROR or status == HTTPStatus.TOO_MANY_REQUESTS
+
+    @staticmethod
+    def is_retryable(error):
+        """timeouts, dropped connections and retryable statuses can be retried"""
+        if isinstance(error, aiohttp.ClientResponseError):
+            return RetryPolicy.retryable_status(error.status)
+        # asyncio.TimeoutError is only an alias of the builtin from python 3.11
+        return isinstance(
+            error,
+            TimeoutError
+            | asyncio.TimeoutError
+            | aiohttp.ClientConnectionError
+            | aiohttp.ClientPayloadError,
+        )
+
+    def take(self, attempt):
+        """claim a retry for a link's `attempt`th retry, if one is still available"""
+        if attempt >= self.max_retries or self.spent >= self.budget:
+            return False
+        self.spent += 1
+        return True
+
+    def delay(self, attempt):
+        """full-jitter exponential backoff for a link's `attempt`th retry"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class LatencyTracker:
+    """Keep the latencies of recent successful requests and report percentiles of them
+
+    Percentiles are only reported once min_samples latencies have been seen,
+    so a crawl's first few requests don't set its hedging delay.
+    """
+
+    def __init__(self, window=1000, min_samples=20):
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+
+    def record(self, latency):
+        self._latencies.append(latency)
+
+    def percentile(self, pct):
+        """return the `pct`th percentile latency, or None without enough samples"""
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
 
 
 class AsyncExplorer:
@@ -21,6 +185,27 @@ class AsyncExplorer:
         parser=None,
         data_dir=None,
         compact=False,
+        max_concurrency=20,
+        max_per_host=None,
+        adaptive=False,
+        max_retries=3,
+        retry_budget=100,
+        parse_workers=0,
+        parse_chunk_size=16,
+        cache=False,
+        incremental=False,
+        resume=False,
+        stream_parse=False,
+        connect_timeout=30,
+        read_timeout=300,
+        archive=False,
+        request_deadline=None,
+        hedge=False,
+        spool_threshold=8 << 20,
+        progress=None,
+        summary=False,
+        storage=None,
+        compress=None,
     ):
         self.name = name
         self.version = version
@@ -29,63 +214,402 @@ class AsyncExplorer:
         self.parser = parser
         self.data_dir = data_dir
         self.compact = compact
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.adaptive = adaptive
+        self.max_retries = max_retries
+        self.retry_budget = retry_budget
+        self.parse_workers = parse_workers
+        self.parse_chunk_size = parse_chunk_size
+        self.cache = cache
+        self.incremental = incremental
+        self.resume = resume
+        self.stream_parse = stream_parse
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.archive = archive
+        self.request_deadline = request_deadline
+        self.hedge = hedge
+        self.spool_threshold = spool_threshold
+        self.progress = progress
+        self.summary = summary
+        self.storage = storage or helpers.DEFAULT_FORMAT
+        self.compress = compress
+        self._spool_dir = None
         self._data = {}
-        self._queue = []
+        self._failed = []
         self.__attrs_post_init__()
 
     def __attrs_post_init__(self):
         """perform the more complex steps of class initialization"""
         if not self.version:
             self.version = time.strftime("%Y-%m-%d", time.localtime())
-        # choose the correct parser class from known parsers
-        if self.parser.lower() == "apipie":
-            self.parser = apipie.APIPie()
-        elif self.parser.lower() == "test":
-            self.parser = test.TestParser()
+        # a re-parse without a parser uses the one its archive was made with
+        self.parser_name = None
+        if self.parser:
+            self._use_parser(self.parser)
+        self._limiter = ConcurrencyLimiter(self.max_concurrency, adaptive=self.adaptive)
+        self._retry = RetryPolicy(self.max_retries, self.retry_budget)
+        self._latencies = LatencyTracker()
+        self._hedging = {"sent": 0, "won": 0, "saved": 0.0}
+        self._shadows = {}
+        self._stats = CrawlStats(self.progress, f"{self.name} {self.version}")
+        self._cache = ResponseCache(f"{self.data_dir}cache/{self.name}") if self.cache else None
+        self._journal = CrawlJournal(f"{self.data_dir}APIs/{self.name}/{self.version}.journal")
+        self._archive = RawArchive(f"{self.data_dir}APIs/{self.name}/{self.version}.raw")
+
+    def _use_parser(self, name):
+        """choose the correct parser class from known parsers"""
+        self.parser_name = name.lower()
+        parser_class = PARSERS.get(self.parser_name)
+        if parser_class is apipie.APIPie:
+            self.parser = parser_class(streaming=self.stream_parse)
+        elif parser_class:
+            self.parser = parser_class()
         if not self.parser or isinstance(self.parser, str):
             logger.warning("No known parser specified! Please review documentation.")
 
-    async def _async_get(self, session, link):
-        """visit a page and download the content, returning the link and content"""
-        async with session.get(self.host_url + link[1], ssl=False) as response:
-            content = await response.read()
+    def _session(self):
+        """create the single http client shared by every request of an exploration
+        it keeps connections alive, caches dns lookups through aiodns and negotiates
+        compressed responses
+        """
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.max_per_host or 0,
+            ttl_dns_cache=300,
+            resolver=aiohttp.AsyncResolver(),
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=self.connect_timeout, sock_read=self.read_timeout
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers={"Accept-Encoding": "gzip, deflate"},
+        )
+
+    async def _fetch(self, session, link, on_slot=None):
+        """make a single request for a link once a concurrency slot is free
+        the request deadline only starts once the slot is held, so time spent queued
+        never counts against it. on_slot, if given, is called as the slot is taken
+        """
+        await self._limiter.acquire()
+        if on_slot:
+            on_slot()
+        start, outcome = time.monotonic(), {"failed": True, "size": 0}
+        try:
+            request = self._request(session, link, start, outcome)
+            if not self.request_deadline:
+                return await request
+            return await asyncio.wait_for(request, self.request_deadline)
+        finally:
+            self._stats.response(time.monotonic() - start, outcome["size"])
+            await self._limiter.release(time.monotonic() - start, outcome["failed"])
+
+    async def _request(self, session, link, start, outcome):
+        """request a link, raising on error statuses and noting the outcome for _fetch
+        when the cached copy of a page is still current, its content is returned as None
+        """
+        url = self.host_url + link[1]
+        headers = self._cache.conditional_headers(url) if self._cache else None
+        async with session.get(url, ssl=False, headers=headers) as response:
+            if headers and response.status == HTTPStatus.NOT_MODIFIED:
+                self._cache.hits += 1
+                outcome["failed"] = False
+                logger.debug("{} is unchanged", link[1])
+                return (link, None)
+            if response.status >= HTTPStatus.BAD_REQUEST:
+                # only statuses worth retrying are the host's trouble, a dead link isn't
+                outcome["failed"] = RetryPolicy.retryable_status(response.status)
+                raise aiohttp.ClientResponseError(
+                    response.request_info,
+                    response.history,
+                    status=response.status,
+                    message=response.reason,
+                )
+            content = await self._read_body(response)
+            outcome["failed"] = False
+            self._latencies.record(time.monotonic() - start)
+            size = content.stat().st_size if isinstance(content, Path) else len(content)
+            outcome["size"] = size
+            if self._cache:
+                self._cache.store(url, response.headers, content)
             logger.debug(link[1])
             return (link, content)
 
-    async def _async_loop(self, links):
-        """asynchronously visit each stored link and store results"""
-        tasks = []
-        async with aiohttp.ClientSession() as session:
-            for link in links:
-                task = asyncio.ensure_future(self._async_get(session, link))
-                tasks.append(task)
-            results = await asyncio.gather(*tasks)
-            for result in results:
-                self._queue.append(result)
-
-    def _visit_links(self, links, retries=3):
-        """main controller for asynchronous page visiting, will attempt 3 retries"""
+    async def _read_body(self, response):
+        """read a response body, spooling it to a temporary file once it passes spool_threshold
+        small bodies are returned as bytes, spooled ones as the Path of their file
+        """
+        if not self.spool_threshold or not self._spool_dir:
+            return await response.read()
+        # aiohttp decompresses as it reads, so Content-Length can't tell the size up front
+        body = bytearray()
+        chunks = response.content.iter_chunked(1 << 16)
+        async for chunk in chunks:
+            body += chunk
+            if len(body) > self.spool_threshold:
+                break
+        else:
+            return bytes(body)
+        with tempfile.NamedTemporaryFile(dir=self._spool_dir, delete=False) as spool:
+            spool.write(body)
+            del body
+            async for chunk in chunks:
+                spool.write(chunk)
+        logger.debug("Spooled {} to {}", response.url, spool.name)
+        return Path(spool.name)
+
+    async def _attempt(self, session, link):
+        """make one attempt at a link, hedging it if it outlasts the p95 latency so far
+        the hedge timer starts once the request holds a concurrency slot, and a hedge is
+        only counted as sent once it holds a slot of its own
+        """
+        delay = self._latencies.percentile(95) if self.hedge else None
+        if delay is None:
+            return await self._fetch(session, link)
+        started = asyncio.Event()
+        primary = asyncio.ensure_future(self._fetch(session, link, on_slot=started.set))
+        waiter = asyncio.ensure_future(started.wait())
         try:
-            loop = asyncio.get_event_loop()
-            loop.run_until_complete(self._async_loop(links))
-        except aiohttp.client_exceptions.ServerDisconnectedError:
+            await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            if not primary.done():
+                await asyncio.wait({primary}, timeout=delay)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        finally:
+            waiter.cancel()
+        if primary.done():
+            return primary.result()
+
+        def _sent():
+            logger.debug("Hedging {} after {:.2f}s", link[1], delay)
+            self._hedging["sent"] += 1
+
+        hedge = asyncio.ensure_future(self._fetch(session, link, on_slot=_sent))
+        return await self._race(primary, hedge)
+
+    async def _race(self, primary, hedge):
+        """return the first successful result of a request and its hedge
+        a slower primary is left to finish in the background, only to measure the time
+        the hedge saved, while a slower hedge is cancelled
+        """
+        pending, error = {primary, hedge}, None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                errors = {task: task.exception() for task in done}
+                winner = next((task for task, err in errors.items() if not err), None)
+                if winner:
+                    break
+                error = error or next(iter(errors.values()))
+            else:
+                raise error
+        except asyncio.CancelledError:
+            primary.cancel()
+            hedge.cancel()
+            raise
+        if winner is hedge:
+            self._hedging["won"] += 1
+            if primary in pending:
+                self._shadows[primary] = time.monotonic()
+                primary.add_done_callback(self._measure_shadow)
+        else:
+            hedge.cancel()
+        return winner.result()
+
+    def _measure_shadow(self, task):
+        """count how much later than its hedge an outraced request finished"""
+        won_at = self._shadows.pop(task, None)
+        if won_at is not None and not task.cancelled() and not task.exception():
+            self._hedging["saved"] += time.monotonic() - won_at
+
+    def _stop_shadows(self):
+        """cancel outraced requests still running, counting their time so far as saved"""
+        now = time.monotonic()
+        for task, won_at in list(self._shadows.items()):
+            self._hedging["saved"] += now - won_at
+            del self._shadows[task]
+            task.cancel()
+
+    async def _async_get(self, session, link):
+        """visit a page and download the content, returning the link and content
+        retryable failures are retried with backoff, exhausted links return None
+        """
+        attempt = 0
+        while True:
+            try:
+                return await self._attempt(session, link)
+            # asyncio.TimeoutError is a separate class before python 3.11
+            except (aiohttp.ClientError, TimeoutError, asyncio.TimeoutError) as err:  # noqa: UP041
+                if not (self._retry.is_retryable(err) and self._retry.take(attempt)):
+                    logger.warning(f"Giving up on {link[1]}: {err!r}")
+                    self._failed.append(link)
+                    return None
+                delay = self._retry.delay(attempt)
+                attempt += 1
+                logger.debug("Retrying {} in {:.1f}s after {!r}", link[1], delay, err)
+                await asyncio.sleep(delay)
+
+    def _store(self, link, scraped):
+        """store a page's scrape results, recording them in the journal and cache"""
+        self._data[link[1]] = scraped
+        self._journal.record(link, scraped)
+        self._stats.link_finished()
+        if self._cache:
+            self._cache.store_scraped(self.host_url + link[1], type(self.parser).__name__, scraped)
+
+    def _scrape(self, link, content):
+        """scrape a single page's content as soon as it arrives"""
+        logger.debug("Scraping {}", link[1])
+        with self._stats.phase("scrape"):
+            scraped = self.parser.scrape_content(content)
+        self._store(link, scraped)
+
+    def _from_cache(self, link):
+        """resolve an unchanged page from the cache, returning its content
+        if the cache already holds this parser's results for the page, they are
+        stored directly and None is returned, since there is nothing left to parse
+        """
+        url = self.host_url + link[1]
+        scraped = self._cache.scraped(url, type(self.parser).__name__)
+        if scraped is not None:
+            self._data[link[1]] = scraped
+            self._journal.record(link, scraped)
+            self._stats.link_finished()
+            if self.archive:
+                self._archive.add(link, self._cache.load_body(url, self.spool_threshold) or b"")
+            return None
+        content = self._cache.load_body(url, self.spool_threshold)
+        if content is None:
+            logger.warning(f"Lost the cached copy of {link[1]}. It will be fetched next time.")
+            self._failed.append(link)
+            self._stats.link_finished(failed=True)
+        return content
+
+    def _parse_pool(self):
+        """create a process pool for page parsing, if the parser allows for it"""
+        if not self.parse_workers:
+            return None
+        # only static scrape methods can be shipped to another process
+        if not isinstance(inspect.getattr_static(self.parser, "scrape_content"), staticmethod):
             logger.warning(
-                "Lost connection to host.{}".join("Retrying in 10 seconds" if retries else "")
+                f"{type(self.parser).__name__} can't parse in worker processes. "
+                "Parsing on the main process instead."
+            )
+            return None
+        return ProcessPoolExecutor(max_workers=self.parse_workers)
+
+    async def _scrape_completed(self, fetches, pool=None):
+        """scrape fetched pages as they complete
+        each finished fetch task is handed over through a queue and dropped once it's
+        scraped, so no finished task keeps holding its page's content
+        """
+        finished, pending = asyncio.Queue(), set()
+        for fetch in fetches:
+            task = asyncio.ensure_future(fetch)
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            task.add_done_callback(finished.put_nowait)
+        try:
+            await self._scrape_finished(finished, len(pending), pool)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _scrape_finished(self, finished, count, pool):
+        """scrape the results of `count` fetch tasks taken from the `finished` queue
+        with a pool, pages are sent to the workers in chunks of parse_chunk_size,
+        so that parsing overlaps with the fetches that are still in flight. each
+        chunk's results come back through the same queue, to be stored right away
+        """
+        loop = asyncio.get_running_loop()
+        scrape_chunk = functools.partial(_scrape_chunk, self.parser.scrape_content)
+        chunk, parsing = [], set()
+        while count or chunk or parsing:
+            if chunk and (not count or len(chunk) >= self.parse_chunk_size):
+                future = loop.run_in_executor(pool, scrape_chunk, chunk)
+                future.add_done_callback(finished.put_nowait)
+                parsing.add(future)
+                chunk = []
+                continue
+            done = await finished.get()
+            if done in parsing:
+                parsing.remove(done)
+                elapsed, scraped = done.result()
+                self._stats.add_time("scrape", elapsed)
+                for link, result in scraped:
+                    self._store(link, result)
+                continue
+            count -= 1
+            result = done.result()
+            if not result:
+                self._stats.link_finished(failed=True)
+                continue
+            link, content = result
+            if content is None and (content := self._from_cache(link)) is None:
+                continue
+            self._archive.add(link, content)
+            if not pool:
+                self._scrape(link, content)
+                continue
+            chunk.append((link, content))
+
+    async def _visit_links(self, session, links):
+        """asynchronously visit each link, scraping pages as they complete"""
+        self._stats.start_crawl(len(links))
+        pool = self._parse_pool()
+        try:
+            await self._scrape_completed((self._async_get(session, link) for link in links), pool)
+        finally:
+            if pool:
+                pool.shutdown()
+            self._stop_shadows()
+        if self._hedging["sent"]:
+            logger.info(
+                f"Hedged {self._hedging['sent']} slow requests, {self._hedging['won']} hedges "
+                f"answered first, saving at least {self._hedging['saved']:.1f}s of tail latency"
             )
-            if retries:
-                time.sleep(10)
-                self._visit_links(links, retries - 1)
+        if self._retry.spent or self._failed:
+            logger.info(f"Spent {self._retry.spent} retries, gave up on {len(self._failed)} links")
+        if self._cache:
+            logger.info(f"{self._cache.hits} of {len(links)} pages were unchanged")
+
+    def _resume(self, links):
+        """restore the results journaled by an earlier crawl, returning the pending links"""
+        journaled, results = self._journal.resume()
+        links = journaled or links
+        self._data.update(results)
+        pending = [link for link in links if link[1] not in results]
+        logger.info(f"Resuming with {len(pending)} of {len(links)} links pending")
+        return pending
+
+    def _hashes_path(self, version):
+        """return the path of a version's per-resource content hashes"""
+        return Path(f"{self.data_dir}APIs/{self.name}/{version}.hashes.json")
 
-    def _link_params(self):
-        """scrape the content downloaded from each page"""
-        while self._queue:
-            link, content = self._queue.pop(0)
-            logger.debug(f"Scraping {link[1]}")
-            self._data[link[1]] = self.parser.scrape_content(content)
+    def _load_previous(self):
+        """hand the latest saved version and its resource hashes to the parser"""
+        if not hasattr(self.parser, "use_previous"):
+            logger.warning(f"{type(self.parser).__name__} doesn't support incremental explores.")
+            return
+        previous = helpers.get_latest(self.name, self.data_dir)
+        if not previous or not self._hashes_path(previous).exists():
+            logger.info("No previous version with resource hashes found. Exploring everything.")
+            return
+        logger.info(f"Reusing unchanged resources from {previous}")
+        self.parser.use_previous(
+            helpers.load_api(self.name, previous, self.data_dir, lazy=True),
+            json.loads(self._hashes_path(previous).read_text()),
+        )
 
     def save_data(self, return_path=False):
         """convert the stored data into yaml-friendly dict and save"""
-        yaml_data = self.parser.yaml_format(self._data)
+        start = time.monotonic()
+        # pages are scraped in completion order, so restore link order here
+        yaml_data = self.parser.yaml_format(dict(sorted(self._data.items())))
         if not yaml_data:
             logger.warning("No data to be saved. Exiting.")
             return None
@@ -94,43 +618,213 @@ class AsyncExplorer:
             from apix.diff import VersionDiff
 
             yaml_data = VersionDiff._truncate(yaml_data)
-            fpath = Path(f"{self.data_dir}APIs/{self.name}/{self.version}-comp.yaml")
-        else:
-            fpath = Path(f"{self.data_dir}APIs/{self.name}/{self.version}.yaml")
-        if fpath.exists():
-            logger.warning(f"{fpath} already exists. Deleting..")
-            fpath.unlink()
-        # create the directory, if it doesn't exist
-        fpath.parent.mkdir(parents=True, exist_ok=True)
-        fpath.touch()
-        logger.info(f"Saving results to {fpath}")
-        with fpath.open("w+") as outfile:
-            yaml.dump(yaml_data, outfile, default_flow_style=False)
+        fpath = helpers.save_api(
+            self.name,
+            self.version,
+            yaml_data,
+            self.data_dir,
+            self.compact,
+            fmt=self.storage,
+            compress=self.compress,
+        )
+        # incremental explores compare against these, so only keep them for full versions
+        if getattr(self.parser, "hashes", None) and not self.compact:
+            self._hashes_path(self.version).write_text(json.dumps(self.parser.hashes))
+        # everything in the journal is now safely saved
+        self._journal.remove()
+        self._stats.add_time("save", time.monotonic() - start)
+        if self.summary:
+            self.save_summary()
         if return_path:
             return fpath
 
-    def explore(self):
-        """main function for the explore module
-        visit the initial page, pulling all links from the page
-        grab content at link found
-        sort the links to account for incorrect async return order
-        scrape the content at each page, per the parser's direction
+    def save_summary(self):
+        """save a json summary of the exploration's progress, throughput and timings"""
+        summary = {
+            "name": self.name,
+            "version": self.version,
+            "host_url": self.host_url,
+            **self._stats.summary(),
+            "retries": self._retry.spent,
+            "hedges": self._hedging,
+            "cache_hits": self._cache.hits if self._cache else 0,
+        }
+        fpath = Path(f"{self.data_dir}APIs/{self.name}/{self.version}.summary.json")
+        fpath.parent.mkdir(parents=True, exist_ok=True)
+        fpath.write_text(json.dumps(summary, indent=2))
+        logger.info(f"Saved the exploration summary to {fpath}")
+        return summary
+
+    async def _fetch_index(self, session):
+        """download the page at base_path, which the rest of the exploration starts from"""
+        index = await self._async_get(session, ("index", self.base_path))
+        if index and index[1] is None:  # unchanged since the last exploration
+            return self._cache.load_body(self.host_url + self.base_path, self.spool_threshold)
+        return index and index[1]
+
+    async def async_explore(self, session=None):
+        """explore the api on the running event loop
+        every request shares `session`, one is created for the exploration if not given
         """
-        result = requests.get(self.host_url + self.base_path, verify=False)
-        if not result:
-            logger.warning(
-                f"I couldn't find anything useful at " f"{self.host_url}{self.base_path}."
-            )
+        if not session:
+            async with self._session() as new_session:
+                return await self.async_explore(new_session)
+        # large bodies are spooled here, and removed once the exploration is done
+        with tempfile.TemporaryDirectory(prefix="apix-") as spool_dir:
+            self._spool_dir = Path(spool_dir)
+            try:
+                return await self._explore_host(session)
+            finally:
+                self._spool_dir = None
+
+    async def _explore_host(self, session):
+        """explore from the host's index page, using `session` for every request"""
+        with self._stats.phase("index"):
+            content = await self._fetch_index(session)
+        if not content:
+            logger.warning(f"I couldn't find anything useful at {self.host_url}{self.base_path}.")
             return None
         self.base_path = self.base_path.replace(".html", "")  # for next step
         logger.info(f"Starting to explore {self.host_url}{self.base_path}")
+        if self.archive:
+            if self.resume:
+                logger.warning("The archive will only hold pages fetched after resuming.")
+            self._archive.start(self.host_url, self.base_path, self.parser_name, content)
+        try:
+            await self._explore_content(session, content)
+        finally:
+            self._archive.finish()
+        return True
+
+    async def _explore_content(self, session, content):
+        """crawl the links found in the index content, or scrape the content itself"""
         if hasattr(self.parser, "pull_links"):
-            links = self.parser.pull_links(result, self.base_path)
+            if self.incremental:  # every linked page is crawled and scraped again
+                parser_class = type(self.parser).__name__
+                logger.warning(f"{parser_class} doesn't support incremental explores.")
+            links = self.parser.pull_links(content, self.base_path)
             logger.debug(f"Found {len(links)} links!")
-            self._visit_links(links)
-            # sort the results by link name, to normalize return order
-            self._queue = sorted(self._queue, key=lambda x: x[0][1])
-            self._link_params()
+            if self.resume and self._journal.path.exists():
+                links = self._resume(links)
+            else:
+                self._journal.start(links)
+            try:
+                with self._stats.phase("crawl"):
+                    await self._visit_links(session, links)
+            finally:
+                self._journal.close()
+            if self.adaptive:
+                logger.info(f"Finished crawling with a concurrency limit of {self._limiter.limit}")
         else:
-            self.parser.scrape_content(result)
+            if self.incremental:
+                self._load_previous()
+            # keep the event loop free while a large document is compiled
+            with self._stats.phase("scrape"):
+                await asyncio.to_thread(self.parser.scrape_content, content)
+
+    def reparse(self):
+        """scrape the raw pages archived by an earlier exploration, without the network"""
+        if not self._archive.path.exists():
+            logger.warning(f"Unable to find an archive at {self._archive.path}.")
+            return None
+        meta = self._archive.open()
+        if not self.parser_name:
+            logger.info(f"Using the {meta['parser']} parser the archive was made with")
+            self._use_parser(meta["parser"])
+        logger.info(f"Re-parsing {len(meta['pages'])} pages from {self._archive.path}")
+        pool = self._parse_pool()
+        try:
+            if not hasattr(self.parser, "pull_links"):
+                with self._stats.phase("scrape"):
+                    self.parser.scrape_content(self._archive.index())
+            elif pool:
+                scrape_chunk = functools.partial(_scrape_chunk, self.parser.scrape_content)
+                chunks = _chunked(self._archive.pages(), self.parse_chunk_size)
+                for elapsed, scraped in pool.map(scrape_chunk, chunks):
+                    self._stats.add_time("scrape", elapsed)
+                    for link, result in scraped:
+                        self._store(link, result)
+            else:
+                for link, content in self._archive.pages():
+                    self._scrape(link, content)
+        finally:
+            self._archive.close()
+            if pool:
+                pool.shutdown()
+        return True
+
+    def explore(self):
+        """main function for the explore module
+        visit the initial page, pulling all links from the page
+        grab content at each link found, scraping each page per the parser's
+        direction as soon as it arrives
+        """
+        return asyncio.run(self.async_explore())
+
+
+# every manifest target shares one session and concurrency limiter, set by these options
+SHARED_OPTIONS = ("max_concurrency", "max_per_host", "adaptive", "connect_timeout", "read_timeout")
+
+
+def load_manifest(manifest_path, **options):
+    """create an explorer for each target listed in a yaml manifest
+    the manifest is either a list of targets or a mapping with a "targets" list.
+    each target needs a name and host_url, and may set base_path, version, parser
+    or any other explorer option but the SHARED_OPTIONS, falling back to `options`
+    """
+    manifest = yaml.safe_load(Path(manifest_path).read_text()) or []
+    if isinstance(manifest, dict):
+        manifest = manifest.get("targets", [])
+    explorers = []
+    for target in manifest:
+        if not target.get("name") or not target.get("host_url"):
+            logger.warning(f"Skipping manifest target without a name and host_url: {target}")
+            continue
+        if target.get("version") is not None:
+            target["version"] = str(target["version"])
+        if shared := [key for key in SHARED_OPTIONS if key in target]:
+            logger.warning(
+                f"Ignoring {', '.join(shared)} for manifest target {target['name']}, "
+                "every target shares the command line's values."
+            )
+            for key in shared:
+                del target[key]
+        explorers.append(AsyncExplorer(**{**options, **target}))
+    return explorers
+
+
+async def explore_all(explorers):
+    """explore many targets concurrently, saving each one as soon as it's done
+    every target shares one session and the first explorer's concurrency limiter,
+    so max_concurrency is a global budget while max_per_host still applies per host
+    """
+    limiter = explorers[0]._limiter
+    for explorer in explorers:
+        explorer._limiter = limiter
+
+    async def _explore_and_save(explorer, session):
+        if not await explorer.async_explore(session):
+            return False
+        await asyncio.to_thread(explorer.save_data)
         return True
+
+    async with explorers[0]._session() as session:
+        results = await asyncio.gather(
+            *(_explore_and_save(explorer, session) for explorer in explorers),
+            return_exceptions=True,
+        )
+    for explorer, result in zip(explorers, results, strict=True):
+        if isinstance(result, Exception):
+            logger.error(f"Exploring {explorer.name} {explorer.version} failed: {result!r}")
+    explored = sum(result is True for result in results)
+    logger.info(f"Explored {explored} of {len(explorers)} targets")
+    return explored
+
+
+def explore_manifest(manifest_path, **options):
+    """explore every target in a manifest concurrently on one event loop"""
+    explorers = load_manifest(manifest_path, **options)
+    if not explorers:
+        logger.warning(f"No targets found in {manifest_path}.")
+        return 0
+    return asyncio.run(explore_all(explorers))
@@ -1,26 +1,384 @@
 """A collection of miscellaneous helpers that don't quite fit in."""
 
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from copy import deepcopy
+import gzip
+import hashlib
 import html
+import io
+import json
+import marshal
+import os
 from pathlib import Path
+import shutil
+from urllib.parse import quote, urlsplit, urlunsplit
+import uuid
 
 from loguru import logger
+import msgpack
 import yaml
 
+from apix.catalog import Catalog
+from apix.params import Param, parse_params
+
+try:
+    import zstandard
+except ImportError:  # optional, for zstd compressed versions and diffs
+    zstandard = None
+
+# the LibYAML bindings are several times faster than the pure python loader and dumper
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+# the line width yaml is wrapped at, pyyaml's default
+YAML_WIDTH = 80
+
+
+class APIDumper(YAML_DUMPER):
+    """A yaml dumper that saves parsed params as the strings they were parsed from"""
+
+
+APIDumper.add_representer(Param, lambda dumper, param: dumper.represent_str(param.raw))
+
+
+# compression formats, with the extension each adds to a file name and how to open one
+COMPRESSIONS = {"gzip": (".gz", gzip.open)}
+if zstandard:
+    COMPRESSIONS["zstd"] = (".zst", zstandard.open)
+
+
+def open_stored(path, mode="rb", tmp_path=None):
+    """Open a saved file, streaming it through a compressor when its extension names one
+    with tmp_path, that is opened instead, compressed as path would be
+    """
+    for suffix, opener in COMPRESSIONS.values():
+        if path.name.endswith(suffix):
+            return opener(tmp_path or path, mode)
+    return (tmp_path or path).open(mode)
+
+
+@contextmanager
+def atomic_open(path, mode="wb"):
+    """Open a file for writing through a temporary file, moved into place once it's complete
+    readers see either the previous file or the new one, never a half-written one
+    """
+    # each writer has its own temporary file, so concurrent saves can't collide
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open_stored(path, mode, tmp_path) as outfile:
+            yield outfile
+        tmp_path.replace(path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def compressed_path(path, compress=None):
+    """Return the path a file is saved at with the given compression, if any"""
+    return path.with_name(path.name + COMPRESSIONS[compress][0]) if compress else path
+
+
+def stored_paths(path):
+    """Return every path a file may be saved at, uncompressed and compressed"""
+    return [path] + [compressed_path(path, compress) for compress in COMPRESSIONS]
+
+
+def find_stored(path):
+    """Return the path a file is actually saved at, compressed or not, or None"""
+    return next((s_path for s_path in stored_paths(path) if s_path.exists()), None)
+
+
+def _uncompressed_name(name):
+    for suffix, _ in COMPRESSIONS.values():
+        name = name.removesuffix(suffix)
+    return name
+
+
+class YAMLStorage:
+    """Store api data as yaml, the readable interchange format"""
+
+    suffix = ".yaml"
+    compressible = True
+
+    @staticmethod
+    def load(path):
+        with open_stored(path, "rt") as infile:
+            return yaml.load(infile, Loader=YAML_LOADER)
+
+    @staticmethod
+    def dump(data, path, depth=0):
+        """write the data one entity at a time, so only one is ever rendered in memory
+        with depth, the entities are that many mappings down, like a diff's under its sections
+        """
+        with atomic_open(path, "wt") as outfile:
+            YAMLStorage._dump_items(data, outfile, depth)
+
+    @staticmethod
+    def _dump_items(data, outfile, depth, indent=""):
+        """write a mapping's items one at a time, descending `depth` mappings into them"""
+        if not isinstance(data, dict) or not data:
+            outfile.write(_indented(_yaml_dump(data, len(indent)), indent))
+            return
+        try:  # the same order a whole dump would sort them into
+            keys = sorted(data)
+        except TypeError:
+            keys = list(data)
+        for key in keys:
+            value = data[key]
+            # a key that fits on one line is written on its own, with its value nested under it
+            head = _yaml_dump({key: {}}, len(indent))
+            nest = head.count("\n") == 1 and head.endswith(": {}\n")
+            if depth and isinstance(value, dict) and value and nest:
+                outfile.write(_indented(head.removesuffix(" {}\n") + "\n", indent))
+                YAMLStorage._dump_items(value, outfile, depth - 1, indent + "  ")
+            else:
+                outfile.write(_indented(_yaml_dump({key: value}, len(indent)), indent))
+
+
+def _yaml_dump(data, indent=0):
+    """render data as block yaml, wrapped as it would be if nested `indent` columns deep"""
+    return yaml.dump(data, Dumper=APIDumper, default_flow_style=False, width=YAML_WIDTH - indent)
+
+
+def _indented(text, indent):
+    """indent each non-empty line of rendered yaml"""
+    if not indent:
+        return text
+    return "".join(indent + line if line.strip() else line for line in text.splitlines(True))
+
+
+class MsgpackStorage:
+    """Store api data as msgpack, a compact binary format that loads much faster than yaml"""
+
+    suffix = ".msgpack"
+    compressible = True
+
+    @staticmethod
+    def load(path):
+        with open_stored(path) as infile:
+            # unpacked as it's read, so a compressed file is never held whole in memory
+            return next(msgpack.Unpacker(infile, strict_map_key=False, max_buffer_size=0))
+
+    @staticmethod
+    def dump(data, path):
+        """write the data one entity at a time, so only one is ever packed in memory"""
+        packer = msgpack.Packer(default=str)
+        with atomic_open(path, "wb") as outfile:
+            if not isinstance(data, dict):
+                outfile.write(packer.pack(data))
+                return
+            outfile.write(packer.pack_map_header(len(data)))
+            for key, value in data.items():
+                outfile.write(packer.pack(key))
+                outfile.write(packer.pack(value))
+
+
+class ObjectStorage:
+    """Store api data in a content-addressed object store, shared by all of an api's versions
+
+    Each entity, and each of its methods, is stored once under the api's objects
+    directory, named by the hash of its content. A version is saved as a json
+    manifest of its entities' hashes, so saving only writes objects that are new.
+    """
+
+    suffix = ".manifest.json"
+    compressible = False
+
+    @staticmethod
+    def _object_path(path, digest):
+        return path.parent / "objects" / digest[:2] / f"{digest}.json"
+
+    @staticmethod
+    def _put(path, obj):
+        """store an object, unless it's already stored, returning its hash"""
+        body = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.sha256(body.encode()).hexdigest()
+        o_path = ObjectStorage._object_path(path, digest)
+        if not o_path.exists():
+            o_path.parent.mkdir(parents=True, exist_ok=True)
+            # an object must never be left half-written under its final name
+            try:
+                with atomic_open(o_path, "wt") as outfile:
+                    outfile.write(body)
+            except OSError:
+                # another save may have stored the same object first
+                if not o_path.exists():
+                    raise
+        return digest
+
+    @staticmethod
+    def _get(path, digest):
+        return json.loads(ObjectStorage._object_path(path, digest).read_text())
+
+    @staticmethod
+    def load(path):
+        data = {}
+        for name, digest in json.loads(path.read_text())["entities"].items():
+            entity = ObjectStorage._get(path, digest)
+            data[name] = entity["data"]
+            if entity["methods"] is not None:
+                data[name]["methods"] = [ObjectStorage._get(path, m) for m in entity["methods"]]
+        return data
+
+    @staticmethod
+    def dump(data, path):
+        entities = {}
+        for name, entity in data.items():
+            stored, methods = entity, None
+            if isinstance(entity, dict) and isinstance(entity.get("methods"), list):
+                methods = [ObjectStorage._put(path, method) for method in entity["methods"]]
+                stored = {key: value for key, value in entity.items() if key != "methods"}
+            entities[name] = ObjectStorage._put(path, {"data": stored, "methods": methods})
+        with atomic_open(path, "wt") as outfile:
+            outfile.write(json.dumps({"entities": entities}))
+
+
+def _decode_shard(path):
+    """read and decode a single shard, in a worker process"""
+    return json.loads(Path(path).read_bytes())
+
+
+class LazyAPI(Mapping):
+    """A read-only view of a sharded version, reading each entity's shard on first access
+
+    Iteration, len and membership only use the version's index. to_dict decodes
+    every shard not read yet in a process pool, since json decoding holds the GIL,
+    unless there are fewer than min_parallel of them to make starting one worthwhile.
+    """
+
+    min_parallel = 64
+
+    def __init__(self, path, index):
+        self.path = Path(path)
+        self._index = index
+        self._loaded = {}
+
+    def _read(self, name):
+        return parse_params(json.loads((self.path / self._index[name]).read_bytes()))
+
+    def __getitem__(self, name):
+        if name not in self._loaded:
+            self._loaded[name] = self._read(name)
+        return self._loaded[name]
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def to_dict(self, workers=None):
+        """return the whole version as a dict, decoding the remaining shards in parallel"""
+        missing = [name for name in self._index if name not in self._loaded]
+        workers = workers or os.cpu_count() or 1
+        if len(missing) < self.min_parallel or workers == 1:
+            for name in missing:
+                self._loaded[name] = self._read(name)
+        else:
+            paths = [self.path / self._index[name] for name in missing]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                shards = pool.map(_decode_shard, paths, chunksize=16)
+                # params are parsed here, so they're interned in this process
+                for name, shard in zip(missing, shards, strict=True):
+                    self._loaded[name] = parse_params(shard)
+        return {name: self._loaded[name] for name in self._index}
+
+
+class ShardedStorage:
+    """Store api data as a directory per version, holding one json file per entity
+
+    The version's index maps each entity to its shard, so a version is loaded as
+    a LazyAPI that only reads the shards of the entities that are looked up.
+    """
+
+    INDEX = "index.json"
+    # the index is what marks a directory as a saved version
+    suffix = f"/{INDEX}"
+    compressible = False
+
+    @staticmethod
+    def load(path):
+        return LazyAPI(path.parent, json.loads(path.read_text())["entities"])
+
+    @staticmethod
+    def dump(data, path):
+        shard_dir = path.parent / "entities"
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        entities = {}
+        for name, entity in data.items():
+            entities[name] = f"entities/{quote(str(name), safe='')}.json"
+            with atomic_open(path.parent / entities[name], "wt") as outfile:
+                json.dump(entity, outfile, default=str)
+        # written last, so the index never names a shard that isn't there yet
+        with atomic_open(path, "wt") as outfile:
+            outfile.write(json.dumps({"entities": entities}))
+        # drop the shards of entities that a previous save held, but this one doesn't
+        for shard in shard_dir.iterdir():
+            if f"entities/{shard.name}" not in entities.values():
+                shard.unlink()
+
+    @staticmethod
+    def remove(path):
+        """remove a sharded version's whole directory"""
+        if path.exists():
+            shutil.rmtree(path.parent)
+
+
+# available storage formats, in the order they are looked for when loading
+STORAGE_FORMATS = {
+    "msgpack": MsgpackStorage,
+    "objects": ObjectStorage,
+    "shards": ShardedStorage,
+    "yaml": YAMLStorage,
+}
+DEFAULT_FORMAT = "msgpack"
+
+
+def _version_name(v_file):
+    """Return the version a stored file or directory holds, or None if it isn't a version"""
+    name = None
+    if (v_file / ShardedStorage.INDEX).exists():
+        name = v_file.name
+    else:
+        file_name = _uncompressed_name(v_file.name)
+        for storage in STORAGE_FORMATS.values():
+            if file_name.endswith(storage.suffix):
+                name = file_name.removesuffix(storage.suffix)
+                break
+    if name and not name.endswith(("-diff", "-comp")):
+        return name
+    return None
+
+
+def get_catalog(data_dir=None, mock=False):
+    """Return the catalog of the apis saved under data_dir"""
+    return Catalog(f"{data_dir}APIs/" if not mock else f"{data_dir}tests/APIs/")
+
 
 def get_api_list(data_dir=None, mock=False):
-    """Return a list of saved apis, if they exist"""
+    """Return a list of saved apis, if they exist
+    the list comes from the catalog, unless apis were added or removed since it was made
+    """
     api_dir = Path(f"{data_dir}APIs/" if not mock else f"{data_dir}tests/APIs/")
     # check exists
     if not api_dir.exists():
         return None
-    # get all versions in directory, that aren't diffs
-    apis = [(api.name, api.stat().st_mtime) for api in api_dir.iterdir() if api.is_dir()] or []
-    return [api for api, _ in sorted(apis, key=lambda x: x[1], reverse=True)]
+    catalog = get_catalog(data_dir, mock)
+    root_mtime = api_dir.stat().st_mtime_ns
+    apis = catalog.apis(root_mtime)
+    if apis is None:
+        found = {api.name: api.stat().st_mtime for api in api_dir.iterdir() if api.is_dir()}
+        apis = catalog.set_apis(root_mtime, found)
+    return apis
 
 
 def get_ver_list(api_name, data_dir=None, mock=False):
-    """Return a list of saved api versions, if they exist"""
+    """Return a list of saved api versions, if they exist
+    the list comes from the catalog, unless the api's directory changed since it was made
+    """
     if mock:
         save_path = Path(f"{data_dir}tests/APIs/{api_name}")
     else:
@@ -28,12 +386,13 @@ def get_ver_list(api_name, data_dir=None, mock=False):
     # check exists
     if not save_path.exists():
         return None
-    # get all versions in directory, that aren't diffs
-    versions = [
-        v_file.name.replace(".yaml", "")
-        for v_file in save_path.iterdir()
-        if "-diff." not in v_file.name and "-comp." not in v_file.name and ".yaml" in v_file.name
-    ] or []
+    catalog = get_catalog(data_dir, mock)
+    dir_mtime = save_path.stat().st_mtime_ns
+    versions = catalog.versions(api_name, dir_mtime)
+    if versions is None:
+        # get all versions in directory, that aren't diffs
+        versions = {_version_name(v_file) for v_file in save_path.iterdir()} - {None}
+        catalog.set_versions(api_name, dir_mtime, versions)
     return sorted(versions, reverse=True)
 
 
@@ -66,31 +425,120 @@ def shift_text(text, shift=1):
     return new_text
 
 
-def load_api(api_name, version, data_dir=None, mock=False):
-    """Load the saved yaml to dict, if the file exists"""
-    if mock:
-        a_path = Path(f"{data_dir}tests/APIs/{api_name}/{version}.yaml")
-    else:
-        a_path = Path(f"{data_dir}APIs/{api_name}/{version}.yaml")
-    if not a_path.exists():
+def api_paths(api_name, version, data_dir=None, mock=False):
+    """Return the path a version would be stored at in each storage format"""
+    base = f"{data_dir}tests/APIs/{api_name}" if mock else f"{data_dir}APIs/{api_name}"
+    return {
+        fmt: Path(f"{base}/{version}{storage.suffix}") for fmt, storage in STORAGE_FORMATS.items()
+    }
+
+
+def _read_cache(cache_path):
+    """Return the (key, data) pair held in a parsed-version cache, or None"""
+    try:
+        key, data = marshal.loads(cache_path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
         return None
-    logger.info(f"Loading {api_name} v{version} from {a_path}")
-    return yaml.load(a_path.open("r"), Loader=yaml.Loader) or None
+    return (key, data) if isinstance(key, dict) else None
 
 
-# (too-many-arguments)
-def save_api(api_name, version, api_dict, data_dir=None, compact=False, mock=False):
-    """Save the dict to yaml, if the file doesn't exist"""
-    if mock:
-        a_path = Path(
-            f"{data_dir}tests/APIs/{api_name}/{version}{'-comp' if compact else ''}.yaml"
-        )
+def _cache_path(a_path):
+    """Return where a version file's parsed-version cache is kept, compressed or not"""
+    return a_path.with_name(_uncompressed_name(a_path.name)).with_suffix(".cache")
+
+
+def load_cached(a_path, storage):
+    """Load a version file through a cache of its parsed data, kept next to it
+    the cache is used while the file's mtime and size are unchanged, or failing that
+    while its content hash matches. otherwise the file is parsed and the cache rebuilt
+    """
+    cache_path = _cache_path(a_path)
+    stat = a_path.stat()
+    key = {"mtime": stat.st_mtime_ns, "size": stat.st_size}
+    cached = _read_cache(cache_path) if cache_path.exists() else None
+    if cached and all(cached[0].get(field) == key[field] for field in key):
+        return cached[1]
+    key["sha256"] = hashlib.sha256(a_path.read_bytes()).hexdigest()
+    if cached and cached[0].get("sha256") == key["sha256"]:
+        data = cached[1]
     else:
-        a_path = Path(f"{data_dir}APIs/{api_name}/{version}{'-comp' if compact else ''}.yaml")
+        logger.debug(f"Parsing {a_path}, its cache is missing or out of date")
+        data = storage.load(a_path)
+    try:
+        cache_path.write_bytes(marshal.dumps((key, data)))
+    except (OSError, ValueError) as err:
+        logger.debug(f"Unable to cache {a_path}: {err}")
+    return data
+
+
+def load_api(api_name, version, data_dir=None, mock=False, lazy=False):
+    """Load a saved version to dict, from the fastest format it's stored in
+    yaml versions are loaded through a parsed-version cache, see load_cached.
+    with lazy, sharded versions are returned as a LazyAPI instead of being read whole.
+    each method's parameter strings are parsed into Params
+    """
+    for fmt, path in api_paths(api_name, version, data_dir, mock).items():
+        if a_path := find_stored(path):
+            logger.info(f"Loading {api_name} v{version} from {a_path}")
+            if STORAGE_FORMATS[fmt] is YAMLStorage:
+                data = load_cached(a_path, YAMLStorage)
+            else:
+                data = STORAGE_FORMATS[fmt].load(a_path)
+            if isinstance(data, LazyAPI):
+                # its params are parsed as each entity is read
+                return (data if lazy else data.to_dict()) or None
+            for entity in (data or {}).values():
+                parse_params(entity)
+            return data or None
+    return None
+
+
+# (too-many-arguments)
+def save_api(
+    api_name,
+    version,
+    api_dict,
+    data_dir=None,
+    compact=False,
+    mock=False,
+    fmt=DEFAULT_FORMAT,
+    compress=None,
+):
+    """Save the dict in the given storage format, replacing any copy in another format
+    with compress, the file is streamed through gzip or zstd as it's written
+    """
+    paths = api_paths(api_name, f"{version}{'-comp' if compact else ''}", data_dir, mock)
+    cache_path = _cache_path(paths["yaml"])
+    if compress and not STORAGE_FORMATS[fmt].compressible:
+        logger.warning(f"The {fmt} storage format can't be compressed. Saving it uncompressed.")
+        compress = None
+    a_path = compressed_path(paths[fmt], compress)
     a_path.parent.mkdir(parents=True, exist_ok=True)
     logger.info(f"Saving {api_name} v{version} to {a_path}")
-    with a_path.open("w") as f:
-        yaml.dump(api_dict, f, default_flow_style=False)
+    STORAGE_FORMATS[fmt].dump(api_dict, a_path)
+    # a stale copy would otherwise be loaded in place of this one
+    for other_fmt, other in paths.items():
+        if STORAGE_FORMATS[other_fmt] is ShardedStorage:
+            if other_fmt != fmt:
+                ShardedStorage.remove(other)
+            continue
+        for s_path in stored_paths(other):
+            if s_path != a_path:
+                s_path.unlink(missing_ok=True)
+    cache_path.unlink(missing_ok=True)
+    if not compact:
+        get_catalog(data_dir, mock).record_version(api_name, version, api_dict)
+    return a_path
+
+
+def index_catalog(api_name=None, data_dir=None, mock=False):
+    """Bring the catalog up to date, indexing the contents of versions it hasn't seen yet"""
+    catalog = get_catalog(data_dir, mock)
+    for api in [api_name] if api_name else get_api_list(data_dir, mock) or []:
+        get_ver_list(api, data_dir, mock)
+    for api, version in catalog.unindexed(api_name):
+        catalog.index_version(api, version, load_api(api, version, data_dir, mock))
+    return catalog
 
 
 def merge_dicts(dict1, dict2):
@@ -121,3 +569,38 @@ def clean_string(string):
     # remove newlines
     string = string.replace("\n", " ")
     return string.strip()
+
+
+def open_content(content):
+    """Open a page's content as a binary file, whether it's bytes or a Path spooled to disk"""
+    return content.open("rb") if isinstance(content, Path) else io.BytesIO(content)
+
+
+def normalize_link(url):
+    """Normalize a link, so that different spellings of the same link compare equal
+    dot segments are resolved from the host's root and the fragment is dropped.
+    the scheme and host are lowercased, while the path keeps its case
+    """
+    parts = urlsplit(url.strip())
+    segments = []
+    for segment in parts.path.split("/"):
+        if segment == "..":
+            # there is nothing above the root to go back to
+            if segments and segments[-1]:
+                segments.pop()
+        elif segment != ".":
+            segments.append(segment)
+    path = "/".join(segments)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+def unique_links(links):
+    """Drop repeated (name, url) links, keeping the first name found for each url"""
+    seen, unique = set(), []
+    for name, url in links:
+        if url not in seen:
+            seen.add(url)
+            unique.append((name, url))
+    if len(unique) < len(links):
+        logger.info(f"Avoided fetching {len(links) - len(unique)} duplicate links")
+    return unique
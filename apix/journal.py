@@ -0,0 +1,63 @@
+"""Record an exploration's progress, so an interrupted crawl can be resumed."""
+import json
+from pathlib import Path
+
+from loguru import logger
+
+
+class CrawlJournal:
+    """An append-only, json-lines record of a crawl's links and scrape results
+
+    The first entry holds every link the crawl set out to visit, and each
+    following entry holds one link and what was scraped from it.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+
+    def _write(self, entry):
+        """append an entry, flushing it so it survives the process dying"""
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def start(self, links):
+        """begin a new journal for a crawl of `links`"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("w")
+        self._write({"links": links})
+
+    def resume(self):
+        """read back an existing journal and continue appending to it
+        returns the crawl's links and a dict of the scrape results recorded per url
+        """
+        links, results = [], {}
+        with self.path.open() as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # the last line may be incomplete if the crawl died mid-write
+                    logger.debug(f"Skipping incomplete journal entry in {self.path}")
+                    continue
+                if "links" in entry:
+                    links = [tuple(link) for link in entry["links"]]
+                else:
+                    results[entry["link"][1]] = entry["result"]
+        self._file = self.path.open("a")
+        return links, results
+
+    def record(self, link, result):
+        """record what was scraped from a link, if the journal is open"""
+        if self._file:
+            self._write({"link": link, "result": result})
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """discard the journal once its results have been saved"""
+        self.close()
+        self.path.unlink(missing_ok=True)
@@ -5,6 +5,7 @@ from pathlib import Path
 from loguru import logger
 
 from apix.helpers import merge_dicts, shift_text
+from apix.params import Param
 
 
 class EntityMaker:
@@ -62,22 +63,22 @@ class EntityMaker:
         return "alpha"
 
     @staticmethod
-    def format_parameter(param_string):
-        """Take in a parameter string and return one that matches our template
+    def format_parameter(name, required, specs):
+        """Take in a parameter's fields and return a dict that matches our template
 
-        Example: cname  ~ required ~ Must be ... string from 1 to 128 characters
+        Example: cname, required, Must be ... string from 1 to 128 characters
         Output: {"cname": {"required": True, "type": "alpha#15"}
         """
-        name, required, specs = (_.strip() for _ in param_string.split("~"))
         required = required == "required"
         ptype = EntityMaker.get_field_type(specs)
-        if " characters " in param_string:
-            split_param = param_string.split()
+        if " characters " in f" {specs}":
+            words = specs.split()
             try:
-                max_len = int(split_param[split_param.index("characters") - 1])
+                # the max length is the word just before "characters"
+                max_len = int(words[: words.index("characters")][-1])
                 max_len = int(max_len / 2)  # let's not get too crazy
-            except ValueError:
-                logger.warning(f"Unable to determine max length for {param_string}. Using 15.")
+            except (ValueError, IndexError):
+                logger.warning(f"Unable to determine max length for {name} ~ {specs}. Using 15.")
                 max_len = 15  # if it isn't where expected, then assign a sane value
             ptype = f"{ptype}#{max_len}"
         return {name: {"required": required, "type": ptype}}
@@ -92,7 +93,7 @@ class EntityMaker:
         """
         if len(name_list) > 1:
             return {name_list[0]: EntityMaker.make_dict(name_list[1:], required, specs)}
-        return EntityMaker.format_parameter(f"{name_list[0]} ~ {required} ~ {specs}")
+        return EntityMaker.format_parameter(name_list[0], required, specs)
 
     @staticmethod
     def compile_params(param_list):
@@ -108,12 +109,14 @@ class EntityMaker:
         }}
         """
         compiled_params = {}
-        for param in param_list:
-            name, *required, specs = (_.strip() for _ in param.split("~"))
-            if not required:
+        for param in map(Param.parse, param_list):
+            name, required, specs = param.name, param.status, param.validator
+            if specs is None:
                 logger.warning(f"Expected parameter for required in: {param}")
-                required = ["optional"]
-            required = required[0]
+                required, specs = "optional", required or ""
+            else:
+                # only the last piece of a validator holding "~" describes the type
+                specs = specs.rsplit("~", 1)[-1].strip()
             name_list = [_.replace("]", "") for _ in name.split("[")]
             comped = EntityMaker.make_dict(name_list, required, specs)
             compiled_params = merge_dicts(compiled_params, comped)
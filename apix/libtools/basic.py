@@ -5,6 +5,7 @@ from pathlib import Path
 from loguru import logger
 
 from apix.helpers import shift_text
+from apix.params import Param
 
 
 class EntityMaker:
@@ -42,7 +43,7 @@ class EntityMaker:
         """
         compiled_params = []
         for param in param_list:
-            name, *_ = (_.strip() for _ in param.split("~"))
+            name = Param.parse(param).name
             if "[" not in name:
                 compiled_params.append(name)
         return compiled_params
@@ -40,7 +40,10 @@ class LibMaker:
             logger.warning(f"I don't know how to make a library for {self.api_name}")
             return
         logger.info(f"Making a {self.template_name} library for {self.api_version}")
-        api_dict = helpers.load_api(self.api_name, self.api_version, data_dir=self.data_dir)
+        # makers look entities up one at a time, so sharded versions are read on demand
+        api_dict = helpers.load_api(
+            self.api_name, self.api_version, data_dir=self.data_dir, lazy=True
+        )
         lib_maker = TemplateMaker(
             api_dict=api_dict, api_name=self.api_name, api_version=self.api_version
         )
@@ -3,6 +3,8 @@ from pathlib import Path
 
 from loguru import logger
 
+from apix.params import Param
+
 
 class EntityMaker:
     def __init__(self, api_dict, api_name, api_version):
@@ -43,8 +45,8 @@ class EntityMaker:
         for method in entity_dict["methods"]:
             for key in ["create", "update"]:
                 if key in method:
-                    for value in method[key]["parameters"]:
-                        clean_name = value.split("~")[0].strip()
+                    for value in map(Param.parse, method[key]["parameters"]):
+                        clean_name = value.name
                         if clean_name == "id":
                             continue  # we don't want to use the id field here
                         if "_ids" in clean_name and clean_name.replace("_ids", "") in names:
@@ -65,15 +67,15 @@ class EntityMaker:
                         elif clean_name not in names and clean_name + "_id" not in names:
                             names.append(clean_name)
                             param_list.append(value)
-        return sorted(param_list)
+        return sorted(param_list, key=str)
 
     @staticmethod
-    def get_field_type(params):  # noqa: PLR0912 - Too many branches
+    def get_field_type(param):  # noqa: PLR0912 - Too many branches
         """there are a number of cases that aren't explicitly covered here.
         In that case, we just give it a string and see what happens.
         I've currently not deternined a time to use FloatField."""
-        params = params.lower()
-        name = next(piece.strip() for piece in params.split("~"))
+        param = Param.parse(param)
+        params, name = param.raw.lower(), param.name.lower()
         if name[-3:] == "_id":
             return "OneToOneField"
         if name[-4:] == "_ids":
@@ -144,7 +146,8 @@ class EntityMaker:
         returns
         'content_view': entity_fields.OneToOneField(ContentView, length=(2, 128))
         """
-        name, required, validator = (piece.strip() for piece in param.split("~"))
+        param = Param.parse(param)
+        name, required, validator = param.name, param.status, param.validator or ""
         required = "required=True" if required == "required" else None
         if " from " in validator:
             # get the length arg length=(6, 12),
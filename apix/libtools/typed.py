@@ -8,6 +8,7 @@ from loguru import logger
 import yaml
 
 from apix.helpers import shift_text
+from apix.params import Param
 
 # Track all fauxfactory types we encounter and need to generate
 FF_TYPES = set()
@@ -369,18 +370,17 @@ class CustomEntityMaker:
 
     def parse_api_parameters(self, api_params_list):
         """Parse API parameters into a structured format"""
-        MAX_PARTS = 3
         parsed_params = {}
         if not api_params_list:
             return parsed_params
 
-        for param_entry in api_params_list:
-            parts = [p.strip() for p in param_entry.split("~")]
-            if len(parts) < MAX_PARTS:
-                logger.warning(f"Skipping malformed parameter entry: {param_entry}")
+        for param in map(Param.parse, api_params_list):
+            if param.validator is None:
+                logger.warning(f"Skipping malformed parameter entry: {param}")
                 continue
 
-            full_name_str, req_str, desc_str = parts[0], parts[1], " ".join(parts[2:])
+            full_name_str, req_str = param.name, param.status
+            desc_str = " ".join(piece.strip() for piece in param.validator.split("~"))
 
             # Extract name parts from parameter string
             name_parts = re.findall(r"\[([^\]]+)\]|([^\[\]]+)", full_name_str)
@@ -2,7 +2,11 @@
 import sys
 
 from loguru import logger
-import urllib3
+
+
+def _stderr_sink(message):
+    """write to the current stderr, so a live progress display can redirect it"""
+    sys.stderr.write(message)
 
 
 def setup_loguru(level="info", path="logs/apix.log"):
@@ -17,9 +21,10 @@ def setup_loguru(level="info", path="logs/apix.log"):
         "{time:YYYY-MM-DD HH:mm:ss.SSS} | " "{level: <8} | " "{name}:{function}:{line} - {message}"
     )
     logger.add(
-        sys.stderr,
+        _stderr_sink,
         level=level.upper(),
         format=console_format,
+        colorize=sys.stderr.isatty(),
     )
     logger.add(
         path,
@@ -30,5 +35,4 @@ def setup_loguru(level="info", path="logs/apix.log"):
     )
 
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 setup_loguru()
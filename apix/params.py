@@ -0,0 +1,81 @@
+"""Parse the "name ~ status ~ validator" parameter strings that versions are saved with."""
+import sys
+
+# the keys a method's parameter list may be saved under
+PARAM_KEYS = ("parameters", "params")
+
+
+class Param:
+    """A parameter, parsed once from its "name ~ status ~ validator" string
+
+    The name, status and validator are interned, since the same few statuses and
+    validators repeat across every method. The original string is kept as raw,
+    so a Param compares equal to, and is saved as, the string it was parsed from,
+    and substring checks on it still work as they did on that string.
+    A missing status or validator is None.
+    """
+
+    __slots__ = ("name", "raw", "status", "validator")
+
+    def __init__(self, name, status=None, validator=None, raw=None):
+        self.name = sys.intern(name)
+        self.status = None if status is None else sys.intern(status)
+        self.validator = None if validator is None else sys.intern(validator)
+        self.raw = raw or " ~ ".join(
+            piece for piece in (name, status, validator) if piece is not None
+        )
+
+    @classmethod
+    def parse(cls, param):
+        """return param as a Param, parsing it if it's still in the string form"""
+        if isinstance(param, cls):
+            return param
+        pieces = [piece.strip() for piece in param.split("~", 2)]
+        pieces += [None] * (3 - len(pieces))
+        return cls(*pieces, raw=param)
+
+    def __str__(self):
+        return self.raw
+
+    def __repr__(self):
+        return f"Param({self.raw!r})"
+
+    def __contains__(self, text):
+        return text in self.raw
+
+    def __eq__(self, other):
+        if isinstance(other, Param):
+            return self.raw == other.raw
+        if isinstance(other, str):
+            return self.raw == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.raw)
+
+
+def unparse_params(data):
+    """return a copy of data with each Param turned back into its string"""
+    if isinstance(data, Param):
+        return data.raw
+    if isinstance(data, dict):
+        return {key: unparse_params(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [unparse_params(item) for item in data]
+    return data
+
+
+def parse_params(entity):
+    """parse the parameter strings of each of an entity's methods, in place"""
+    methods = entity.get("methods") if isinstance(entity, dict) else None
+    for method in methods or []:
+        for details in method.values() if isinstance(method, dict) else []:
+            if not isinstance(details, dict):
+                continue
+            for key in PARAM_KEYS:
+                if isinstance(details.get(key), list):
+                    details[key] = [
+                        Param.parse(param) if isinstance(param, str) else param
+                        for param in details[key]
+                    ]
+    return entity
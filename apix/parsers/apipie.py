@@ -6,17 +6,197 @@ Parser classes must currently implement the following methods:
     yaml_format - Returns yaml-friendly dict of the compiled data.
     scrape_content - Returns a dict of params and paths from a single page.
 """
+import codecs
+import hashlib
+import json
+from pathlib import Path
+import re
+from urllib.parse import urlsplit
+
 from loguru import logger
+from lxml import html
+
+from apix.helpers import clean_string, normalize_link, open_content
+
+
+class JSONStream:
+    """Decode a json document one value at a time from a file-like object
+
+    Only the value currently being decoded is built into python objects, and raw
+    text is dropped from the buffer as soon as it has been consumed.
+    """
+
+    WHITESPACE = " \t\n\r"
+    NUMBER = "0123456789.eE+-"
+    # the characters that matter when skipping over a value, and a whole json string
+    STRUCTURE = re.compile(r'["{}\[\]]')
+    STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+
+    def __init__(self, stream, chunk_size=1 << 16):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size=None):
+        """read more of the stream into the buffer, returning False at its end"""
+        if self._eof:
+            return False
+        chunk = self._stream.read(size or self._chunk_size)
+        self._eof = not chunk
+        text = self._utf8.decode(chunk, final=self._eof) if isinstance(chunk, bytes) else chunk
+        self._buf = self._buf[self._pos :] + text
+        self._pos = 0
+        return not self._eof
+
+    def peek(self):
+        """return the next non-whitespace character without consuming it"""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in self.WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars):
+        """consume the next character, which must be one of `chars`"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} in json document, found {char!r}")
+        self._pos += 1
+        return char
 
-from apix.helpers import clean_string
+    def value(self):
+        """decode and consume the next complete json value"""
+        self.peek()
+        size = self._chunk_size
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+                # a number cut by the end of the buffer, even just past its "." or "e",
+                # decodes early, but no complete value is followed by a number character
+                if self._eof or self._buf[end : end + 1] not in ("", *self.NUMBER):
+                    self._pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            # grow reads geometrically, so large values aren't re-decoded too often
+            self._fill(size)
+            size *= 2
+
+    def skip(self):
+        """consume the next complete json value without decoding it into python objects"""
+        if self.peek() not in "{[":
+            self.value()  # a scalar is cheap to decode
+            return
+        depth, size = 0, self._chunk_size
+        while True:
+            match = self.STRUCTURE.search(self._buf, self._pos)
+            string = match and match.group() == '"' and self.STRING.match(self._buf, match.start())
+            if string:
+                self._pos = string.end()
+            elif match and match.group() != '"':
+                self._pos = match.end()
+                depth += 1 if match.group() in "{[" else -1
+                if not depth:
+                    return
+            else:
+                # the value, or one of its strings, continues past the buffer
+                self._pos = match.start() if match else len(self._buf)
+                if not self._fill(size):
+                    raise ValueError("Unterminated value in json document")
+                size *= 2
+
+    def object_keys(self):
+        """iterate over the keys of the object starting at the current position
+        the caller must consume each key's value before asking for the next key
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+
+def iter_resources(content, values=True):
+    """Yield (name, resource) pairs from an apidoc's docs.resources, one at a time
+    content is the document's bytes, a Path to it or a file object reading it.
+    without values, each resource is skipped over undecoded and yielded as None
+    """
+    if isinstance(content, bytes | Path):
+        with open_content(content) as document:
+            yield from iter_resources(document, values)
+        return
+    stream = JSONStream(content)
+    for key in stream.object_keys():
+        if key != "docs":
+            stream.skip()
+            continue
+        for doc_key in stream.object_keys():
+            if doc_key != "resources":
+                stream.skip()
+                continue
+            for name in stream.object_keys():
+                if values:
+                    yield name, stream.value()
+                else:
+                    stream.skip()
+                    yield name, None
+
+
+def _is_json(content):
+    """check whether a page's content is a json document, rather than html"""
+    with open_content(content) as page:
+        return page.read(256).lstrip()[:1] == b"{"
+
+
+def html_resource_names(content, base_path):
+    """Return the names of the resources linked to by an html apidoc index
+    resources are the pages directly under base_path, like apidoc/v2/hosts.html
+    """
+    prefix = f"/{base_path.strip('/')}/"
+    with open_content(content) as page:
+        links = html.parse(page).getroot().iterlinks()
+    names = []
+    for _, _, url, _ in links:
+        path = "/" + urlsplit(normalize_link(url)).path.lstrip("/")
+        name = path.removeprefix(prefix).removesuffix(".html")
+        if path.startswith(prefix) and name and "/" not in name and name not in names:
+            names.append(name)
+    return names
 
 
 class APIPie:
     """Parser class for Ruby's APIPie apidoc generator"""
 
-    def __init__(self):
+    def __init__(self, streaming=False):
+        self.streaming = streaming
         self._data = {}
         self.params = {}
+        self.hashes = {}
+        self.skipped = 0
+        self._previous = {}
+        self._previous_hashes = {}
+
+    def use_previous(self, data, hashes):
+        """Reuse previously compiled resources whose content hash hasn't changed"""
+        self._previous = data or {}
+        self._previous_hashes = hashes or {}
+
+    @staticmethod
+    def _hash_resource(resource):
+        """Return a stable content hash of a single resource's documentation"""
+        return hashlib.sha256(json.dumps(resource, sort_keys=True).encode()).hexdigest()
 
     @staticmethod
     def _compile_params(params, parent=None):
@@ -46,16 +226,77 @@ class APIPie:
         ]
         return {"paths": paths, "params": APIPie._compile_params(method_dict["params"])}
 
-    def scrape_content(self, result):
-        """Compile the data into their corresponding classifications"""
-        entity_docs = result.json()["docs"]["resources"]
-        for name, data in entity_docs.items():
-            logger.debug(f"Compiling {name} with {len(data['methods'])} methods")
-            self._data[name] = {"methods": []}
+    @staticmethod
+    def _iter_resources(content, streaming=False):
+        """Yield the apidoc's resources, streaming them from the body in streaming mode"""
+        if streaming:
+            yield from iter_resources(content)
+        else:
+            yield from json.loads(content)["docs"]["resources"].items()
+
+    @staticmethod
+    def _compile_entity(name, data):
+        """Compile a single resource's methods"""
+        logger.debug("Compiling {} with {} methods", name, len(data["methods"]))
+        return {
+            "methods": [
+                {method["name"]: APIPie._compile_method(method)} for method in data["methods"]
+            ]
+        }
+
+    def _compile_resource(self, name, data, streaming=False):
+        """Compile a single resource, unless it's unchanged since the previous version"""
+        self.hashes[name] = self._hash_resource(data)
+        if name in self._previous and self._previous_hashes.get(name) == self.hashes[name]:
+            self._data[name] = self._previous[name]
+            self.skipped += 1
+            return
+        self._data[name] = self._compile_entity(name, data)
+        # holding on to every raw param defeats the point of streaming
+        if not streaming:
             for method in data["methods"]:
-                self._data[name]["methods"].append({method["name"]: self._compile_method(method)})
                 self.params.update({param["name"]: param for param in method["params"]})
 
+    def scrape_content(self, content):
+        """Compile the data into their corresponding classifications"""
+        # a document spooled to disk is always streamed, as it's too large to load at once
+        streaming = self.streaming or isinstance(content, Path)
+        total = 0
+        for name, data in self._iter_resources(content, streaming):
+            self._compile_resource(name, data, streaming)
+            total += 1
+        if self._previous_hashes:
+            logger.info(f"Skipped {self.skipped} of {total} unchanged resources")
+
     def yaml_format(self, ingore=None):
         """Return the compiled data in a yaml-friendly format"""
         return self._data
+
+
+class APIPieResources(APIPie):
+    """Parser class for APIPie that fetches each resource's json document as a link"""
+
+    @staticmethod
+    def pull_links(content, base_path):
+        """return a link to the json document of each resource listed in the index
+        an html index is only scanned for resource links. a json index is the whole
+        apidoc, whose resources are skipped over undecoded to read just their names
+        """
+        base_path = base_path.removesuffix(".json")
+        if _is_json(content):
+            names = [name for name, _ in iter_resources(content, values=False)]
+        else:
+            names = html_resource_names(content, base_path)
+        return [(name, f"{base_path}/{name}.json") for name in names]
+
+    @staticmethod
+    def scrape_content(content):
+        """compile the resources found in a single resource's json document"""
+        return {name: APIPie._compile_entity(name, data) for name, data in iter_resources(content)}
+
+    def yaml_format(self, data):
+        """merge every page's compiled resources into a yaml-friendly dict"""
+        self._data = {}
+        for resources in data.values():
+            self._data.update(resources)
+        return self._data
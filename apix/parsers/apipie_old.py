@@ -9,6 +9,8 @@ Parser classes must currently implement the following methods:
 from loguru import logger
 from lxml import html
 
+from apix.helpers import normalize_link, open_content, unique_links
+
 
 class OldAPIPie:
     """Parser class for Ruby's APIPie apidoc generator"""
@@ -48,21 +50,22 @@ class OldAPIPie:
         return yaml_data
 
     @staticmethod
-    def pull_links(result, base_path):
+    def pull_links(content, base_path):
         """return all desired links from the target page"""
-        g_links = html.fromstring(result.content).iterlinks()
-        links, last = [], None
+        with open_content(content) as page:
+            g_links = html.parse(page).getroot().iterlinks()
+        links = []
         for link in g_links:
-            url = link[2].replace("../", "")
-            if "/" in url[len(base_path) :] and link[0].text and url != last:
+            url = normalize_link(link[2])
+            if "/" in url[len(base_path) :] and link[0].text:
                 links.append((link[0].text, url))
-                last = url
-        return links
+        return unique_links(links)
 
     @staticmethod
     def scrape_content(content):
         """pull the paths and parameters from the h1 and tables on the page"""
-        tree = html.fromstring(content)
+        with open_content(content) as page:
+            tree = html.parse(page).getroot()
         paths = tree.xpath("//h1")
         path_list = [path.text.replace("\n      ", "") for path in paths]
         params = tree.xpath("//table/tbody/tr")
@@ -10,6 +10,8 @@ https://www.google.com/search?q=apix
 """
 from lxml import html
 
+from apix.helpers import normalize_link, open_content, unique_links
+
 
 class TestParser:
     """Parser class for testing purposes only."""
@@ -38,21 +40,22 @@ class TestParser:
         return yaml_data
 
     @staticmethod
-    def pull_links(result, base_path):
+    def pull_links(content, base_path):
         """return all desired links from the target page"""
-        g_links = html.fromstring(result.content).iterlinks()
-        links, last = [], None
+        with open_content(content) as page:
+            g_links = html.parse(page).getroot().iterlinks()
+        links = []
         for link in g_links:
-            url = link[2].replace("../", "")
-            if "JacobCallahan" in url and "sparkline" not in url and link[0].text and url != last:
+            url = normalize_link(link[2])
+            if "JacobCallahan" in url and "sparkline" not in url and link[0].text:
                 links.append((link[0].text, url))
-                last = url
-        return links
+        return unique_links(links)
 
     @staticmethod
     def scrape_content(content):
         """take the title text from a page, if it exists"""
-        tree = html.fromstring(content)
+        with open_content(content) as page:
+            tree = html.parse(page).getroot()
         title = tree.xpath("//head/title")
         title = title[0].text if title else "This page had no title for some reason"
         return [x.strip() for x in title.split() if x]
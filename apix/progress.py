@@ -0,0 +1,106 @@
+"""Track an exploration's progress and throughput, for a live display and a run summary."""
+from bisect import bisect_left
+from contextlib import contextmanager
+import time
+
+from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    TextColumn,
+    TimeRemainingColumn,
+)
+
+# upper bounds, in seconds, of the request latency histogram's buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def progress_display():
+    """create a live display of every exploration's progress, drawn on stderr"""
+    return Progress(
+        TextColumn("[bold cyan]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TextColumn("{task.fields[pending]} pending, {task.fields[failed]} failed"),
+        TextColumn("{task.fields[rate]}"),
+        TimeRemainingColumn(),
+        console=Console(stderr=True),
+    )
+
+
+class CrawlStats:
+    """Count an exploration's links, requests, bytes, latencies and time spent per phase
+
+    When given a rich Progress display, each finished link also refreshes the
+    exploration's row in it with the pending/done/failed counts and throughput.
+    """
+
+    def __init__(self, display=None, description=""):
+        self.display = display
+        self.description = description
+        self.total = self.done = self.failed = 0
+        self.requests = self.bytes = 0
+        self.latencies = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.phases = {}
+        self._started = None
+        self._task = None
+
+    @contextmanager
+    def phase(self, name):
+        """time a phase of the exploration, adding to any earlier time spent in it"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.monotonic() - start)
+
+    def add_time(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def start_crawl(self, total):
+        """begin counting a crawl of `total` links"""
+        self.total = total
+        self._started = time.monotonic()
+        if self.display:
+            self._task = self.display.add_task(
+                self.description, total=total, pending=total, failed=0, rate=""
+            )
+
+    def response(self, latency, size=0):
+        """count a finished request, successful or not"""
+        self.requests += 1
+        self.bytes += size
+        self.latencies[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def link_finished(self, failed=False):
+        """count a link that was scraped, or given up on"""
+        if failed:
+            self.failed += 1
+        else:
+            self.done += 1
+        if self._task is not None:
+            elapsed = max(time.monotonic() - self._started, 1e-9)
+            rate = f"{self.requests / elapsed:.1f} req/s {self.bytes / elapsed / 1024:.0f} KiB/s"
+            self.display.update(
+                self._task,
+                completed=self.done + self.failed,
+                pending=self.total - self.done - self.failed,
+                failed=self.failed,
+                rate=rate,
+            )
+
+    def histogram(self):
+        """return the request count of each latency bucket, keyed by its upper bound"""
+        bounds = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        return dict(zip(bounds, self.latencies, strict=True))
+
+    def summary(self):
+        """return a json-friendly summary of the exploration"""
+        return {
+            "links": {"total": self.total, "done": self.done, "failed": self.failed},
+            "requests": self.requests,
+            "bytes": self.bytes,
+            "latency_histogram": self.histogram(),
+            "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+        }
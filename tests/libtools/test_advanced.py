@@ -0,0 +1,20 @@
+"""Tests for apix.libtools.advanced."""
+from apix.libtools import advanced
+
+
+def test_positive_compile_params():
+    compiled = advanced.EntityMaker.compile_params(
+        [
+            "compute_resource  ~ required ~ Must be a Hash",
+            "compute_resource[name]  ~ optional ~ Must be a String",
+            "name ~ required ~ must be a string ~ see docs",
+        ]
+    )
+    assert compiled == {
+        "compute_resource": {
+            "required": True,
+            "type": {},
+            "name": {"required": False, "type": "alpha"},
+        },
+        "name": {"required": True, "type": "alpha"},
+    }
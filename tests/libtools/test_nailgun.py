@@ -1,6 +1,7 @@
 """Tests for apix.diff."""
 from apix.helpers import load_api
 from apix.libtools import nailgun
+from apix.params import Param
 
 
 def test_positive_name_to_proper_name():
@@ -56,6 +57,7 @@ def test_positive_get_field_type():
     }
     for param, expected in params.items():
         assert nailgun.EntityMaker.get_field_type(param) == expected
+        assert nailgun.EntityMaker.get_field_type(Param.parse(param)) == expected
 
 
 def test_positive_arg_override():
@@ -0,0 +1,169 @@
+"""Tests for apix.parsers.apipie."""
+from copy import deepcopy
+import io
+import json
+
+from apix.parsers import apipie
+
+DOCS = {
+    "docs": {
+        "resources": {
+            "architectures": {
+                "methods": [
+                    {
+                        "name": "create",
+                        "apis": [{"http_method": "post", "api_url": "/api/architectures"}],
+                        "params": [
+                            {
+                                "name": "architecture",
+                                "required": True,
+                                "deprecated": False,
+                                "validator": "Must be a <code>Hash</code>",
+                                "params": [
+                                    {
+                                        "name": "name",
+                                        "required": True,
+                                        "deprecated": False,
+                                        "validator": "Must be a String",
+                                    }
+                                ],
+                            }
+                        ],
+                    }
+                ]
+            },
+            "hosts": {
+                "methods": [
+                    {
+                        "name": "index",
+                        "apis": [{"http_method": "get", "api_url": "/api/hosts"}],
+                        "params": [
+                            {
+                                "name": "search",
+                                "required": False,
+                                "deprecated": False,
+                                "validator": "Must be a String",
+                            }
+                        ],
+                    }
+                ]
+            },
+        }
+    }
+}
+
+
+def _content(docs):
+    return json.dumps(docs, indent=2).encode()
+
+
+def test_positive_scrape_content():
+    parser = apipie.APIPie()
+    parser.scrape_content(_content(DOCS))
+    data = parser.yaml_format()
+    assert list(data) == ["architectures", "hosts"]
+    assert data["architectures"]["methods"][0]["create"] == {
+        "paths": ["POST /api/architectures"],
+        "params": [
+            "architecture ~ required ~ must be a hash",
+            "architecture[name] ~ required ~ must be a string",
+        ],
+    }
+
+
+def test_positive_incremental_skips_unchanged():
+    first = apipie.APIPie()
+    first.scrape_content(_content(DOCS))
+    changed = deepcopy(DOCS)
+    changed["docs"]["resources"]["hosts"]["methods"][0]["params"][0]["required"] = True
+    second = apipie.APIPie()
+    second.use_previous({"architectures": "reused", "hosts": "reused"}, first.hashes)
+    second.scrape_content(_content(changed))
+    assert second.skipped == 1
+    assert second._data["architectures"] == "reused"
+    assert second._data["hosts"]["methods"][0]["index"]["params"] == [
+        "search ~ required ~ must be a string"
+    ]
+
+
+def test_positive_streaming_matches_full_parse():
+    full, streamed = apipie.APIPie(), apipie.APIPie(streaming=True)
+    full.scrape_content(_content(DOCS))
+    streamed.scrape_content(_content(DOCS))
+    assert streamed.yaml_format() == full.yaml_format()
+    assert streamed.hashes == full.hashes
+    assert not streamed.params
+
+
+def test_positive_spooled_document_streams(tmp_path):
+    spooled = tmp_path / "v2.json"
+    spooled.write_bytes(_content(DOCS))
+    full, parser = apipie.APIPie(), apipie.APIPie()
+    full.scrape_content(_content(DOCS))
+    parser.scrape_content(spooled)
+    assert parser.yaml_format() == full.yaml_format()
+    assert not parser.params
+
+
+def test_positive_iter_resources_small_chunks():
+    docs = {"api_url": "/api", "resources": DOCS["docs"]["resources"]}
+    doc = {"info": {"version": 2.5}, "docs": docs}
+    stream = apipie.JSONStream(io.BytesIO(json.dumps(doc).encode()), chunk_size=7)
+    assert next(stream.object_keys()) == "info"
+    assert stream.value() == {"version": 2.5}
+    stream.expect(",")
+    assert stream.value() == "docs"
+    stream.expect(":")
+    assert [(key, stream.value()) for key in stream.object_keys()] == list(docs.items())
+
+
+def test_positive_iter_resources_empty():
+    assert not list(apipie.iter_resources(b'{"docs": {"resources": {}}}'))
+
+
+def test_positive_resources_pull_links():
+    links = apipie.APIPieResources.pull_links(_content(DOCS), "apidoc/v2.json")
+    assert links == [
+        ("architectures", "apidoc/v2/architectures.json"),
+        ("hosts", "apidoc/v2/hosts.json"),
+    ]
+
+
+def test_positive_resources_pull_links_html():
+    index = b"""<html><body>
+    <a href="/apidoc/v2/architectures.html">Architectures</a>
+    <a href="/apidoc/v2/architectures/create.html">create</a>
+    <a href="../apidoc/v2/hosts.html">Hosts</a>
+    <a href="/apidoc/v2/hosts.html">Hosts</a>
+    <a href="/apidoc/v1/domains.html">Domains</a>
+    </body></html>"""
+    links = apipie.APIPieResources.pull_links(index, "apidoc/v2")
+    assert links == [
+        ("architectures", "apidoc/v2/architectures.json"),
+        ("hosts", "apidoc/v2/hosts.json"),
+    ]
+
+
+def test_positive_skip_small_chunks():
+    tricky = {"text": 'a "quoted" } ] { [ \\', "nested": [{"x": [1, {"y": "}"}]}], "n": 3}
+    doc = json.dumps({"skipped": tricky, "after": [1, 2], "scalar": 1.5, "last": "kept"})
+    stream = apipie.JSONStream(io.BytesIO(doc.encode()), chunk_size=3)
+    kept = {}
+    for key in stream.object_keys():
+        if key == "last":
+            kept[key] = stream.value()
+        else:
+            stream.skip()
+    assert kept == {"last": "kept"}
+    assert stream.peek() == ""
+
+
+def test_positive_resources_match_full_parse():
+    full = apipie.APIPie()
+    full.scrape_content(_content(DOCS))
+    parser = apipie.APIPieResources()
+    scraped = {}
+    for name, data in DOCS["docs"]["resources"].items():
+        page = json.dumps({"docs": {"resources": {name: data}}}).encode()
+        scraped[f"apidoc/v2/{name}.json"] = parser.scrape_content(page)
+    assert parser.yaml_format(scraped) == full.yaml_format()
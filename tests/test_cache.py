@@ -0,0 +1,49 @@
+"""Tests for apix.cache."""
+from apix.cache import ResponseCache
+
+URL = "https://host/apidoc/v2/hosts/index.html"
+
+
+def test_positive_store_and_load(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.store(URL, {"ETag": '"abc"', "Last-Modified": "Sat, 17 Oct 2026 06:00:00 GMT"}, b"body")
+    assert cache.load_body(URL) == b"body"
+    assert cache.conditional_headers(URL) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Sat, 17 Oct 2026 06:00:00 GMT",
+    }
+
+
+def test_positive_store_and_load_spooled(tmp_path):
+    spooled = tmp_path / "spooled"
+    spooled.write_bytes(b"a large body")
+    cache = ResponseCache(tmp_path / "cache")
+    cache.store(URL, {"ETag": '"abc"'}, spooled)
+    assert cache.load_body(URL) == b"a large body"
+    body_path = cache.load_body(URL, spool_threshold=4)
+    assert body_path == cache._paths(URL)[1]
+    assert body_path.read_bytes() == b"a large body"
+
+
+def test_positive_scraped_reset_on_store(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.store(URL, {"ETag": '"abc"'}, b"body")
+    cache.store_scraped(URL, "TestParser", ["scraped"])
+    assert cache.scraped(URL, "TestParser") == ["scraped"]
+    assert cache.scraped(URL, "OldAPIPie") is None
+    cache.store(URL, {"ETag": '"def"'}, b"new body")
+    assert cache.scraped(URL, "TestParser") is None
+
+
+def test_negative_corrupt_body(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.store(URL, {"ETag": '"abc"'}, b"body")
+    cache._paths(URL)[1].write_bytes(b"tampered")
+    assert cache.load_body(URL) is None
+    assert not cache.conditional_headers(URL)
+
+
+def test_negative_unknown_url(tmp_path):
+    cache = ResponseCache(tmp_path)
+    assert cache.get(URL) is None
+    assert not cache.conditional_headers(URL)
@@ -0,0 +1,84 @@
+"""Tests for apix.catalog."""
+import os
+import time
+
+from apix import helpers
+from apix.catalog import MTIME_GRANULARITY, Catalog
+
+
+def _save_versions(tmp_path):
+    data_dir = f"{tmp_path}/"
+    for version in ("1.3", "2.1"):
+        api_data = helpers.load_api("test123", version, "./", mock=True)
+        helpers.save_api("test123", version, api_data, data_dir)
+    return data_dir
+
+
+def _age(path, mtime=None):
+    """set a directory's mtime to `mtime`, or to when its listing can be trusted"""
+    mtime = mtime or time.time_ns() - MTIME_GRANULARITY
+    os.utime(path, ns=(mtime, mtime))
+    return mtime
+
+
+def test_positive_catalog_lists(tmp_path):
+    data_dir = _save_versions(tmp_path)
+    _age(tmp_path / "APIs/test123")
+    assert (tmp_path / "apix-catalog.sqlite").exists()
+    assert helpers.get_api_list(data_dir) == ["test123"]
+    assert helpers.get_ver_list("test123", data_dir) == ["2.1", "1.3"]
+    catalog = helpers.get_catalog(data_dir)
+    api_dir = tmp_path / "APIs/test123"
+    assert catalog.versions("test123", api_dir.stat().st_mtime_ns) == ["1.3", "2.1"]
+
+
+def test_positive_catalog_rescans_changed_dirs(tmp_path):
+    data_dir = _save_versions(tmp_path)
+    assert helpers.get_ver_list("test123", data_dir) == ["2.1", "1.3"]
+    for path in helpers.api_paths("test123", "1.3", data_dir).values():
+        path.unlink(missing_ok=True)
+    assert helpers.get_ver_list("test123", data_dir) == ["2.1"]
+    results = helpers.get_catalog(data_dir).search("entity", "entity", "test123")
+    assert {row[1] for row in results} == {"2.1"}
+
+
+def test_positive_catalog_rescans_recent_dirs(tmp_path):
+    data_dir = _save_versions(tmp_path)
+    api_dir = tmp_path / "APIs/test123"
+    mtime = _age(api_dir, api_dir.stat().st_mtime_ns)
+    assert helpers.get_ver_list("test123", data_dir) == ["2.1", "1.3"]
+    # saved by another process within the listing's timestamp tick, leaving the mtime as is
+    helpers.YAMLStorage.dump({}, api_dir / "3.0.yaml")
+    _age(api_dir, mtime)
+    assert helpers.get_ver_list("test123", data_dir) == ["3.0", "2.1", "1.3"]
+    # once the mtime is old enough, the listing is cached
+    _age(api_dir)
+    assert helpers.get_ver_list("test123", data_dir) == ["3.0", "2.1", "1.3"]
+    assert helpers.get_catalog(data_dir).versions("test123", api_dir.stat().st_mtime_ns)
+
+
+def test_positive_catalog_search(tmp_path):
+    data_dir = _save_versions(tmp_path)
+    catalog = helpers.get_catalog(data_dir)
+    results = catalog.search("path", "entity_one/:id/create")
+    assert {row[1] for row in results} == {"1.3", "2.1"}
+    assert all(row[2:4] == ("entity_one", "create") for row in results)
+    assert catalog.search("param", "param1 ", "test123")
+    assert not catalog.search("param", "%")
+    assert not catalog.search("entity", "missing")
+
+
+def test_positive_index_catalog(tmp_path):
+    data_dir = f"{tmp_path}/"
+    api_dir = tmp_path / "APIs/test123"
+    api_dir.mkdir(parents=True)
+    api_data = helpers.load_api("test123", "2.1", "./", mock=True)
+    # saved without save_api, so the catalog hasn't seen it
+    helpers.YAMLStorage.dump(api_data, api_dir / "2.1.yaml")
+    catalog = Catalog(tmp_path / "APIs")
+    assert not catalog.search("entity", "entity_one")
+    helpers.index_catalog("test123", data_dir)
+    assert catalog.search("entity", "entity_one") == [
+        ("test123", "2.1", "entity_one", None, "entity_one")
+    ]
+    assert not catalog.unindexed()
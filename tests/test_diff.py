@@ -1,8 +1,10 @@
 """Tests for apix.diff."""
 from pathlib import Path
 
-from apix import diff
-from apix.helpers import load_api
+import yaml
+
+from apix import diff, helpers
+from apix.helpers import YAMLStorage, load_api
 
 
 def test_positive_fill_defaults():
@@ -21,8 +23,51 @@ def test_positive_save_diff():
     Path(path).unlink()
 
 
+def test_positive_save_diff_streams_entities(tmp_path, monkeypatch):
+    rendered = []
+
+    def _yaml_dump(data, indent=0):
+        rendered.append(data)
+        return yaml_dump(data, indent)
+
+    yaml_dump = helpers._yaml_dump
+    monkeypatch.setattr(helpers, "_yaml_dump", _yaml_dump)
+    vdiff = diff.VersionDiff(data_dir="./", mock=True)
+    vdiff.diff()
+    path = tmp_path / "diff.yaml"
+    YAMLStorage.dump(vdiff._vdiff, path, depth=1)
+    # no whole section is ever rendered at once, and the file matches a whole dump
+    assert not any(
+        section in data and data[section] for data in rendered for section in vdiff._vdiff
+    )
+    assert path.read_text() == yaml.dump(
+        vdiff._vdiff, Dumper=helpers.APIDumper, default_flow_style=False
+    )
+
+
 def test_positive_validate_diff():
     vdiff = diff.VersionDiff(data_dir="./", mock=True)
     vdiff.diff()
     good_diff = load_api("test123", "good-diff", "./", True)
     assert vdiff._vdiff == good_diff
+
+
+def test_positive_save_compressed_diff():
+    vdiff = diff.VersionDiff(data_dir="./", mock=True, compress="gzip")
+    vdiff.diff()
+    path = vdiff.save_diff(return_path=True)
+    assert path.name == "1.3-to-2.1-diff.yaml.gz"
+    assert YAMLStorage.load(path) == load_api("test123", "good-diff", "./", True)
+    path.unlink()
+
+
+def test_positive_list_diff_matches_by_name():
+    vdiff = diff.VersionDiff(data_dir="./", mock=True)
+    list1 = ["b ~ required ~ String", "a ~ optional ~ String", "c ~ optional ~ Hash", "plain"]
+    list2 = ["a ~ optional ~ String", "plain", "b ~ optional ~ String"]
+    added, changed = vdiff._list_diff(list1, list2)
+    assert added == ["c ~ optional ~ Hash"]
+    assert changed == ["b ~ required ~ String"]
+    methods1 = [{"create": {"paths": ["POST /a"]}}, {"list": {"paths": ["GET /a"]}}]
+    methods2 = [{"list": {"paths": ["GET /b"]}}, {"create": {"paths": ["POST /a"]}}]
+    assert vdiff._list_diff(methods1, methods2) == ([{"list": {"paths": ["GET /a"]}}], [])
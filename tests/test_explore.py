@@ -1,5 +1,123 @@
 """Tests for apix.explore"""
-from apix import explore
+import asyncio
+import json
+import tracemalloc
+
+import aiohttp
+from aiohttp import test_utils, web
+import yaml
+
+from apix import explore, helpers
+
+INDEX = """<html><body>
+<a href="JacobCallahan/apix">apix</a>
+<a href="JacobCallahan/nailgun">nailgun</a>
+<a href="JacobCallahan/nailgun">nailgun</a>
+<a href="JacobCallahan/apix#readme">apix readme</a>
+<a href="../JacobCallahan/./nailgun">nailgun</a>
+</body></html>"""
+
+
+class FakeResponse:
+    """A canned aiohttp response whose body is its own url"""
+
+    def __init__(self, url, status=200):
+        self.url = url
+        self.status = status
+        self.headers = {"ETag": f'"{url}"'}
+        self.request_info, self.history, self.reason = None, (), None
+
+    async def read(self):
+        return self.url.encode()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Serve canned responses, dropping the connection once for each flaky url
+    urls in statuses are always answered with their status
+    """
+
+    def __init__(self, flaky=(), statuses=None):
+        self.flaky = set(flaky)
+        self.statuses = statuses or {}
+        self.calls = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.calls.append(url)
+        if url in self.flaky:
+            self.flaky.discard(url)
+            raise aiohttp.ServerDisconnectedError()
+        if headers and headers.get("If-None-Match") == f'"{url}"':
+            return FakeResponse(url, status=304)
+        return FakeResponse(url, status=self.statuses.get(url, 200))
+
+
+class SlowResponse(FakeResponse):
+    def __init__(self, url, delay):
+        super().__init__(url)
+        self.delay = delay
+
+    async def read(self):
+        await asyncio.sleep(self.delay)
+        return await super().read()
+
+
+class SlowSession(FakeSession):
+    """Answer the first request for each slow url only after `delay` seconds"""
+
+    def __init__(self, slow=(), delay=1.0):
+        super().__init__()
+        self.slow = set(slow)
+        self.delay = delay
+
+    def get(self, url, headers=None, **kwargs):
+        self.calls.append(url)
+        if url in self.slow:
+            self.slow.discard(url)
+            return SlowResponse(url, self.delay)
+        return FakeResponse(url)
+
+
+async def _serve_repos(request):
+    if request.path == "/JacobCallahan":
+        return web.Response(text=INDEX, content_type="text/html")
+    name = request.path.split("/")[-1]
+    return web.Response(
+        text=f"<html><head><title>JacobCallahan/{name}</title></head></html>",
+        content_type="text/html",
+    )
+
+
+def _serve_locally(explore_func):
+    """run explore_func with the url of a local server that looks like a github user page"""
+
+    async def _run():
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", _serve_repos)
+        async with test_utils.TestServer(app) as server:
+            return await explore_func(str(server.make_url("/")))
+
+    return asyncio.run(_run())
+
+
+def _explore_local(**kwargs):
+    async def _explore(host_url):
+        t_explorer = explore.AsyncExplorer(host_url=host_url, base_path="JacobCallahan", **kwargs)
+        return t_explorer, await t_explorer.async_explore()
+
+    return _serve_locally(_explore)
+
+
+def _get_all(explorer, session, links):
+    async def _run():
+        return await asyncio.gather(*(explorer._async_get(session, link) for link in links))
+
+    return asyncio.run(_run())
 
 
 def test_positive_explore():
@@ -16,3 +134,375 @@ def test_positive_explore():
     data_dir = save_file.parent
     save_file.unlink()
     data_dir.rmdir()
+
+
+def test_positive_pull_links_deduplicated():
+    links = explore.test.TestParser.pull_links(INDEX.encode(), "JacobCallahan")
+    assert links == [("apix", "JacobCallahan/apix"), ("nailgun", "JacobCallahan/nailgun")]
+
+
+def test_positive_explore_local(tmp_path):
+    t_explorer, explored = _explore_local(
+        name="test", version="1.0", parser="test", data_dir=f"{tmp_path}/"
+    )
+    assert explored
+    assert t_explorer._data == {
+        "JacobCallahan/apix": ["JacobCallahan/apix"],
+        "JacobCallahan/nailgun": ["JacobCallahan/nailgun"],
+    }
+    assert t_explorer.save_data(return_path=True).exists()
+
+
+def test_positive_explore_summary(tmp_path):
+    t_explorer, _ = _explore_local(
+        name="test", version="1.0", parser="test", data_dir=f"{tmp_path}/", summary=True
+    )
+    t_explorer.save_data()
+    summary = json.loads((tmp_path / "APIs/test/1.0.summary.json").read_text())
+    assert summary["links"] == {"total": 2, "done": 2, "failed": 0}
+    assert summary["requests"] == sum(summary["latency_histogram"].values())
+    assert sorted(summary["phases"]) == ["crawl", "index", "save", "scrape"]
+
+
+def test_positive_explore_spooled(tmp_path):
+    t_explorer, explored = _explore_local(
+        name="test", version="1.0", parser="test", data_dir=f"{tmp_path}/", spool_threshold=16
+    )
+    assert explored
+    assert t_explorer._data == {
+        "JacobCallahan/apix": ["JacobCallahan/apix"],
+        "JacobCallahan/nailgun": ["JacobCallahan/nailgun"],
+    }
+    assert t_explorer._spool_dir is None
+
+
+def test_positive_explore_manifest(tmp_path):
+    async def _explore(host_url):
+        manifest = tmp_path / "targets.yaml"
+        manifest.write_text(
+            yaml.dump(
+                {
+                    "targets": [
+                        {"name": "one", "host_url": host_url, "version": 1.0},
+                        {"name": "two", "host_url": host_url, "version": 2.0},
+                        {"name": "missing", "version": 3.0},
+                    ]
+                }
+            )
+        )
+        explorers = explore.load_manifest(
+            manifest, base_path="JacobCallahan", parser="test", data_dir=f"{tmp_path}/"
+        )
+        return await explore.explore_all(explorers)
+
+    assert _serve_locally(_explore) == len(["one", "two"])
+    assert helpers.get_ver_list("one", f"{tmp_path}/") == ["1.0"]
+    assert helpers.get_ver_list("two", f"{tmp_path}/") == ["2.0"]
+
+
+def test_positive_manifest_ignores_shared_options(tmp_path):
+    manifest = tmp_path / "targets.yaml"
+    target = {"name": "one", "host_url": "http://localhost/", "max_concurrency": 5, "hedge": True}
+    manifest.write_text(yaml.dump([target]))
+    options = {"max_concurrency": 50, "data_dir": f"{tmp_path}/"}
+    (explorer,) = explore.load_manifest(manifest, **options)
+    assert explorer.max_concurrency == options["max_concurrency"]
+    assert explorer.hedge
+
+
+def test_positive_archive_reparse(tmp_path):
+    options = {"name": "test", "version": "1.0", "parser": "test", "data_dir": f"{tmp_path}/"}
+    t_explorer, _ = _explore_local(archive=True, **options)
+    assert t_explorer._archive.path.exists()
+    reparsed = explore.AsyncExplorer(**options)
+    assert reparsed.reparse()
+    assert reparsed._data == t_explorer._data
+    pooled = explore.AsyncExplorer(parse_workers=2, parse_chunk_size=1, **options)
+    assert pooled.reparse()
+    assert pooled._data == t_explorer._data
+    # without a parser, the one the archive was made with is used
+    archived = explore.AsyncExplorer(**{**options, "parser": None})
+    assert archived.reparse()
+    assert archived.parser_name == "test"
+    assert archived._data == t_explorer._data
+
+
+def test_negative_reparse_without_archive(tmp_path):
+    t_explorer = explore.AsyncExplorer(name="test", parser="test", data_dir=f"{tmp_path}/")
+    assert not t_explorer.reparse()
+
+
+def test_positive_limiter_adapts():
+    limiter = explore.ConcurrencyLimiter(8, adaptive=True)
+    limits = [limiter.limit]
+
+    async def _respond(latency, failed=False):
+        await limiter.acquire()
+        await limiter.release(latency, failed)
+
+    async def _run():
+        for _ in range(4):  # a full window of fast responses grows the limit
+            await _respond(0.1)
+        limits.append(limiter.limit)
+        await _respond(0.1, failed=True)  # a failure halves it
+        limits.append(limiter.limit)
+        for _ in range(2):  # a window of slow responses shrinks it
+            await _respond(1.0)
+        limits.append(limiter.limit)
+
+    asyncio.run(_run())
+    assert limits == [4, 5, 2, 1]
+
+
+def test_positive_limiter_ignores_dead_links():
+    t_explorer = explore.AsyncExplorer(
+        host_url="http://host/", parser="test", adaptive=True, retry_budget=0
+    )
+    session = FakeSession(statuses={"http://host/dead": 404, "http://host/down": 503})
+    start = t_explorer._limiter.limit
+    assert _get_all(t_explorer, session, [("dead", "dead")]) == [None]
+    assert t_explorer._limiter.limit == start  # a dead link isn't the host's trouble
+    assert _get_all(t_explorer, session, [("down", "down")]) == [None]
+    assert t_explorer._limiter.limit == start // 2
+
+
+def test_positive_limiter_fixed():
+    limiter = explore.ConcurrencyLimiter(3)
+
+    async def _run():
+        for _ in range(3):
+            await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        await limiter.release(0.1, failed=True)
+        await waiter
+        assert limiter.limit == limiter.max_limit
+
+    asyncio.run(_run())
+
+
+def test_positive_retry_failed_link_only():
+    t_explorer = explore.AsyncExplorer(host_url="http://host/", parser="test")
+    t_explorer._retry.base_delay = 0
+    session = FakeSession(flaky=["http://host/b"])
+    links = [("a", "a"), ("b", "b"), ("c", "c")]
+    results = _get_all(t_explorer, session, links)
+    assert [link for link, _ in results] == links
+    assert sorted(session.calls) == [
+        "http://host/a",
+        "http://host/b",
+        "http://host/b",
+        "http://host/c",
+    ]
+    assert t_explorer._retry.spent == 1
+    assert not t_explorer._failed
+
+
+def test_negative_retry_budget_exhausted():
+    t_explorer = explore.AsyncExplorer(host_url="http://host/", parser="test", retry_budget=0)
+    session = FakeSession(flaky=["http://host/b"])
+    results = _get_all(t_explorer, session, [("a", "a"), ("b", "b")])
+    assert results[1] is None
+    assert t_explorer._failed == [("b", "b")]
+
+
+def test_positive_retryable_errors():
+    assert explore.RetryPolicy.is_retryable(TimeoutError())
+    assert explore.RetryPolicy.is_retryable(asyncio.TimeoutError())  # noqa: UP041
+    assert explore.RetryPolicy.is_retryable(aiohttp.ServerDisconnectedError())
+    assert explore.RetryPolicy.retryable_status(503)
+    assert explore.RetryPolicy.retryable_status(429)
+    assert not explore.RetryPolicy.retryable_status(404)
+    assert not explore.RetryPolicy.is_retryable(ValueError())
+
+
+def test_positive_latency_percentile():
+    tracker = explore.LatencyTracker(min_samples=3)
+    tracker.record(1.0)
+    assert tracker.percentile(95) is None
+    for latency in (3.0, 2.0, 4.0):
+        tracker.record(latency)
+    assert [tracker.percentile(50), tracker.percentile(95)] == [3.0, 4.0]
+
+
+def test_positive_hedge_slow_request():
+    t_explorer = explore.AsyncExplorer(host_url="http://host/", parser="test", hedge=True)
+    for _ in range(t_explorer._latencies.min_samples):
+        t_explorer._latencies.record(0.01)
+    session = SlowSession(slow=["http://host/slow"], delay=0.5)
+
+    async def _run():
+        start = asyncio.get_running_loop().time()
+        result = await t_explorer._async_get(session, ("slow", "slow"))
+        elapsed = asyncio.get_running_loop().time() - start
+        await asyncio.sleep(0.6)  # let the outraced request finish
+        return result, elapsed
+
+    result, elapsed = asyncio.run(_run())
+    assert result == (("slow", "slow"), b"http://host/slow")
+    assert elapsed < session.delay
+    assert session.calls == ["http://host/slow", "http://host/slow"]
+    assert [t_explorer._hedging["sent"], t_explorer._hedging["won"]] == [1, 1]
+    assert t_explorer._hedging["saved"] > 0
+    assert not t_explorer._shadows
+
+
+def test_negative_hedge_without_latencies():
+    t_explorer = explore.AsyncExplorer(host_url="http://host/", parser="test", hedge=True)
+    session = SlowSession(slow=["http://host/slow"], delay=0.1)
+    results = _get_all(t_explorer, session, [("slow", "slow")])
+    assert results == [(("slow", "slow"), b"http://host/slow")]
+    assert session.calls == ["http://host/slow"]
+    assert not t_explorer._hedging["sent"]
+
+
+def test_positive_request_deadline():
+    t_explorer = explore.AsyncExplorer(
+        host_url="http://host/", parser="test", request_deadline=0.05
+    )
+    t_explorer._retry.base_delay = 0
+    session = SlowSession(slow=["http://host/slow"], delay=1.0)
+    results = _get_all(t_explorer, session, [("slow", "slow")])
+    assert results == [(("slow", "slow"), b"http://host/slow")]
+    assert session.calls == ["http://host/slow", "http://host/slow"]
+    assert t_explorer._retry.spent == 1
+
+
+def test_positive_request_deadline_excludes_queueing():
+    t_explorer = explore.AsyncExplorer(
+        host_url="http://host/", parser="test", max_concurrency=1, request_deadline=0.25
+    )
+    links = [(name, name) for name in "abcd"]
+    session = SlowSession(slow=[f"http://host/{name}" for name in "abcd"], delay=0.15)
+    results = _get_all(t_explorer, session, links)
+    # each link waits for the one before it, but only its own request is timed
+    assert [link for link, _ in results] == links
+    assert len(session.calls) == len(links)
+    assert not t_explorer._retry.spent
+
+
+def test_negative_hedge_while_queued():
+    t_explorer = explore.AsyncExplorer(
+        host_url="http://host/", parser="test", max_concurrency=1, hedge=True
+    )
+    for _ in range(t_explorer._latencies.min_samples):
+        t_explorer._latencies.record(0.1)
+    links = [(name, name) for name in "abcde"]
+    session = SlowSession(slow=[f"http://host/{name}" for name in "abcde"], delay=0.05)
+    results = _get_all(t_explorer, session, links)
+    assert [link for link, _ in results] == links
+    assert len(session.calls) == len(links)
+    assert not t_explorer._hedging["sent"]
+
+
+def test_positive_parse_pool():
+    t_explorer = explore.AsyncExplorer(parser="test", parse_workers=2, parse_chunk_size=2)
+    pages = [
+        ((f"page {i}", f"p{i}"), f"<html><head><title>page {i}</title></head></html>".encode())
+        for i in range(5)
+    ]
+
+    async def _fetched(page):
+        return page
+
+    async def _run():
+        with t_explorer._parse_pool() as pool:
+            await t_explorer._scrape_completed([_fetched(page) for page in pages], pool)
+
+    asyncio.run(_run())
+    assert sorted(t_explorer._data) == ["p0", "p1", "p2", "p3", "p4"]
+    assert t_explorer._data["p3"] == ["page", "3"]
+
+
+def test_positive_parse_pool_stores_while_crawling():
+    t_explorer = explore.AsyncExplorer(parser="test", parse_workers=2, parse_chunk_size=2)
+    pages, stored_before_last = 3, []
+
+    async def _fetched(i):
+        if i == pages - 1:
+            # the last page waits for the first chunk's results, for up to 10 seconds
+            for _ in range(1000):
+                if t_explorer._data:
+                    break
+                await asyncio.sleep(0.01)
+            stored_before_last.append(len(t_explorer._data))
+        return (f"page {i}", f"p{i}"), f"<html><head><title>{i}</title></head></html>".encode()
+
+    async def _run():
+        with t_explorer._parse_pool() as pool:
+            await t_explorer._scrape_completed([_fetched(i) for i in range(pages)], pool)
+
+    asyncio.run(_run())
+    assert stored_before_last == [2]
+    assert sorted(t_explorer._data) == ["p0", "p1", "p2"]
+
+
+def test_positive_scraped_pages_are_released():
+    t_explorer = explore.AsyncExplorer(parser="test")
+    page_size, pages = 1 << 20, 20
+
+    async def _fetched(_session, link):
+        # each page arrives once the one before it has been scraped
+        while len(t_explorer._data) < int(link[1]):
+            await asyncio.sleep(0)
+        padding = b"x" * page_size
+        return link, b"<html><head><title>p</title></head><!--" + padding + b"-->"
+
+    t_explorer._async_get = _fetched
+    tracemalloc.start()
+    try:
+        asyncio.run(t_explorer._visit_links(None, [(str(i), str(i)) for i in range(pages)]))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(t_explorer._data) == pages
+    assert peak < page_size * 5
+
+
+def test_negative_parse_pool_stateful_parser():
+    t_explorer = explore.AsyncExplorer(parser="apipie", parse_workers=2)
+    assert t_explorer._parse_pool() is None
+
+
+def test_positive_cache_reuses_unchanged_pages(tmp_path):
+    links = [("a", "a.html"), ("b", "b.html")]
+
+    def _explore():
+        t_explorer = explore.AsyncExplorer(
+            name="test",
+            host_url="http://host/",
+            parser="test",
+            data_dir=f"{tmp_path}/",
+            cache=True,
+        )
+        session = FakeSession()
+
+        async def _run():
+            tasks = [t_explorer._async_get(session, link) for link in links]
+            await t_explorer._scrape_completed(tasks)
+
+        asyncio.run(_run())
+        return t_explorer
+
+    first = _explore()
+    assert first._cache.hits == 0
+    second = _explore()
+    assert second._cache.hits == len(links)
+    assert second._data == first._data
+
+
+def test_positive_resume_pending_links(tmp_path):
+    links = [("a", "a.html"), ("b", "b.html"), ("c", "c.html")]
+    first = explore.AsyncExplorer(
+        name="test", version="1.0", parser="test", data_dir=f"{tmp_path}/"
+    )
+    first._journal.start(links)
+    first._store(links[1], ["scraped", "b"])
+    first._journal.close()
+    second = explore.AsyncExplorer(
+        name="test", version="1.0", parser="test", data_dir=f"{tmp_path}/", resume=True
+    )
+    assert second._resume(links[:1]) == [links[0], links[2]]
+    assert second._data == {"b.html": ["scraped", "b"]}
+    second._journal.close()
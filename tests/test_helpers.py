@@ -1,5 +1,11 @@
 """Tests for apix.helpers."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import yaml
+
 from apix import helpers
+from apix.params import Param
 
 
 def test_positive_get_api_list():
@@ -44,3 +50,191 @@ def test_positive_load_api():
 
 def test_negative_load_api():
     assert not helpers.load_api(api_name="test123", version="3.9", data_dir="./", mock=True)
+
+
+def test_positive_normalize_link():
+    assert helpers.normalize_link("../apidoc/v2/hosts.html") == "apidoc/v2/hosts.html"
+    assert helpers.normalize_link("apidoc/./v2/../v2/hosts.html#top") == "apidoc/v2/hosts.html"
+    assert helpers.normalize_link("/../Apidoc/v2?page=2#x") == "/Apidoc/v2?page=2"
+    assert helpers.normalize_link("HTTPS://My.Host/Apidoc/") == "https://my.host/Apidoc/"
+
+
+def test_positive_unique_links():
+    links = [("hosts", "apidoc/hosts"), ("users", "apidoc/users"), ("Hosts", "apidoc/hosts")]
+    assert helpers.unique_links(links) == links[:2]
+
+
+@pytest.mark.parametrize("fmt", list(helpers.STORAGE_FORMATS))
+def test_positive_save_and_load_api(tmp_path, fmt):
+    api_data = helpers.load_api("test123", "2.1", "./", mock=True)
+    data_dir = f"{tmp_path}/"
+    helpers.save_api("test123", "2.1", api_data, data_dir, fmt=fmt)
+    assert helpers.load_api("test123", "2.1", data_dir) == api_data
+    assert helpers.get_ver_list("test123", data_dir) == ["2.1"]
+
+
+def test_positive_save_api_replaces_other_formats(tmp_path):
+    data_dir = f"{tmp_path}/"
+    for fmt in helpers.STORAGE_FORMATS:
+        helpers.save_api("test123", "1.0", {"format": fmt}, data_dir, fmt=fmt)
+    paths = helpers.api_paths("test123", "1.0", data_dir)
+    assert [fmt for fmt, path in paths.items() if path.exists()] == [fmt]
+    assert helpers.load_api("test123", "1.0", data_dir) == {"format": fmt}
+
+
+@pytest.mark.parametrize("compress", list(helpers.COMPRESSIONS))
+@pytest.mark.parametrize("fmt", ["yaml", "msgpack"])
+def test_positive_save_and_load_compressed_api(tmp_path, fmt, compress):
+    api_data = helpers.load_api("test123", "2.1", "./", mock=True)
+    data_dir = f"{tmp_path}/"
+    helpers.save_api("test123", "2.1", api_data, data_dir, fmt=fmt)
+    a_path = helpers.save_api("test123", "2.1", api_data, data_dir, fmt=fmt, compress=compress)
+    suffix = helpers.COMPRESSIONS[compress][0]
+    assert a_path.name == f"2.1{helpers.STORAGE_FORMATS[fmt].suffix}{suffix}"
+    # the uncompressed copy is replaced by the compressed one
+    assert [path.name for path in a_path.parent.iterdir()] == [a_path.name]
+    assert helpers.load_api("test123", "2.1", data_dir) == api_data
+    assert helpers.get_ver_list("test123", data_dir) == ["2.1"]
+
+
+def test_positive_get_ver_list_ignores_sidecars(tmp_path):
+    api_dir = tmp_path / "APIs/test123"
+    api_dir.mkdir(parents=True)
+    for name in ("1.0.yaml", "1.0.hashes.json", "1.1.journal", "1.1.raw", "1.0-comp.yaml"):
+        (api_dir / name).touch()
+    (api_dir / "1.0-to-1.1-diff.yaml").touch()
+    assert helpers.get_ver_list("test123", f"{tmp_path}/") == ["1.0"]
+
+
+def test_positive_load_cached(tmp_path, monkeypatch):
+    a_path = tmp_path / "1.0.yaml"
+    helpers.YAMLStorage.dump({"entity": {"methods": ["list"]}}, a_path)
+    assert helpers.load_cached(a_path, helpers.YAMLStorage) == {"entity": {"methods": ["list"]}}
+    assert a_path.with_suffix(".cache").exists()
+
+    def _fail(path):
+        raise AssertionError(f"{path} should have been loaded from its cache")
+
+    monkeypatch.setattr(helpers.YAMLStorage, "load", _fail)
+    assert helpers.load_cached(a_path, helpers.YAMLStorage) == {"entity": {"methods": ["list"]}}
+    # a copy with a new mtime, but the same content, is still served from the cache
+    a_path.write_bytes(a_path.read_bytes())
+    assert helpers.load_cached(a_path, helpers.YAMLStorage) == {"entity": {"methods": ["list"]}}
+
+
+def test_positive_load_cached_rebuilt_on_change(tmp_path):
+    a_path = tmp_path / "1.0.yaml"
+    helpers.YAMLStorage.dump({"entity": {"methods": ["list"]}}, a_path)
+    helpers.load_cached(a_path, helpers.YAMLStorage)
+    helpers.YAMLStorage.dump({"entity": {"methods": ["list", "create"]}}, a_path)
+    assert helpers.load_cached(a_path, helpers.YAMLStorage) == {
+        "entity": {"methods": ["list", "create"]}
+    }
+    a_path.with_suffix(".cache").write_bytes(b"corrupt")
+    assert helpers.load_cached(a_path, helpers.YAMLStorage)["entity"]["methods"] == [
+        "list",
+        "create",
+    ]
+
+
+def test_positive_object_storage_deduplicates(tmp_path):
+    data_dir = f"{tmp_path}/"
+    older = helpers.load_api("test123", "1.3", "./", mock=True)
+    newer = helpers.load_api("test123", "2.1", "./", mock=True)
+    helpers.save_api("test123", "1.3", older, data_dir, fmt="objects")
+    objects = set((tmp_path / "APIs/test123/objects").rglob("*.json"))
+    helpers.save_api("test123", "2.1", newer, data_dir, fmt="objects")
+    new_objects = set((tmp_path / "APIs/test123/objects").rglob("*.json")) - objects
+    # only the entities and methods that changed between the versions are written again
+    total = sum(len(entity["methods"]) + 1 for entity in newer.values())
+    assert 0 < len(new_objects) < total
+    assert helpers.load_api("test123", "1.3", data_dir) == older
+    assert helpers.load_api("test123", "2.1", data_dir) == newer
+    assert helpers.get_ver_list("test123", data_dir) == ["2.1", "1.3"]
+
+
+def test_positive_sharded_storage_loads_lazily(tmp_path):
+    data_dir = f"{tmp_path}/"
+    api_data = helpers.load_api("test123", "2.1", "./", mock=True)
+    helpers.save_api("test123", "2.1", api_data, data_dir, fmt="shards")
+    shards = list((tmp_path / "APIs/test123/2.1/entities").iterdir())
+    assert len(shards) == len(api_data)
+    lazy = helpers.load_api("test123", "2.1", data_dir, lazy=True)
+    assert isinstance(lazy, helpers.LazyAPI)
+    assert list(lazy) == list(api_data)
+    assert "entity_one" in lazy
+    assert not lazy._loaded
+    assert lazy["entity_one"] == api_data["entity_one"]
+    assert list(lazy._loaded) == ["entity_one"]
+    assert lazy.to_dict() == api_data
+
+
+def test_positive_sharded_storage_decodes_in_processes(tmp_path):
+    a_path = tmp_path / "1.0" / helpers.ShardedStorage.INDEX
+    api_data = {
+        f"entity_{i}": {"methods": [{"list": {"paths": [], "params": ["p ~ optional ~ x"]}}]}
+        for i in range(helpers.LazyAPI.min_parallel)
+    }
+    helpers.ShardedStorage.dump(api_data, a_path)
+    lazy = helpers.ShardedStorage.load(a_path)
+    assert lazy["entity_0"] == api_data["entity_0"]
+    loaded = lazy.to_dict(workers=2)
+    assert loaded == api_data
+    assert isinstance(loaded["entity_1"]["methods"][0]["list"]["params"][0], Param)
+
+
+def test_positive_sharded_storage_drops_removed_entities(tmp_path):
+    a_path = tmp_path / "1.0" / helpers.ShardedStorage.INDEX
+    helpers.ShardedStorage.dump({"one": {"methods": []}, "two": {"methods": []}}, a_path)
+    helpers.ShardedStorage.dump({"one": {"methods": ["list"]}}, a_path)
+    assert [shard.name for shard in (tmp_path / "1.0/entities").iterdir()] == ["one.json"]
+    assert helpers.ShardedStorage.load(a_path).to_dict() == {"one": {"methods": ["list"]}}
+
+
+def test_positive_get_ver_list_finds_sharded_versions(tmp_path):
+    data_dir = f"{tmp_path}/"
+    helpers.save_api("test123", "1.0", {"entity": {}}, data_dir, fmt="shards")
+    helpers.save_api("test123", "1.1", {"entity": {}}, data_dir, fmt="objects")
+    helpers.save_api("test123", "1.1", {"entity": {}}, data_dir, compact=True, fmt="shards")
+    # neither the object store nor a compacted version are versions of their own
+    assert helpers.get_ver_list("test123", data_dir) == ["1.1", "1.0"]
+
+
+def test_positive_streamed_yaml_matches_whole_dump(tmp_path):
+    a_path = tmp_path / "2.1.yaml"
+    api_data = helpers.YAMLStorage.load(helpers.api_paths("test123", "2.1", "./", True)["yaml"])
+    helpers.YAMLStorage.dump(api_data, a_path)
+    whole = yaml.dump(api_data, Dumper=helpers.YAML_DUMPER, default_flow_style=False)
+    assert a_path.read_text() == whole
+
+
+def test_negative_atomic_open_keeps_previous_file(tmp_path):
+    a_path = tmp_path / "1.0.yaml.gz"
+    helpers.YAMLStorage.dump({"entity": {"methods": ["list"]}}, a_path)
+
+    def _interrupted():
+        with helpers.atomic_open(a_path, "wt") as outfile:
+            outfile.write("entity: {}\n")
+            raise RuntimeError("interrupted mid-write")
+
+    with pytest.raises(RuntimeError):
+        _interrupted()
+    # the half-written file is discarded, and the previous one is still whole
+    assert [path.name for path in tmp_path.iterdir()] == [a_path.name]
+    assert helpers.YAMLStorage.load(a_path) == {"entity": {"methods": ["list"]}}
+
+
+def test_positive_object_storage_concurrent_saves(tmp_path):
+    api_data = helpers.load_api("test123", "2.1", "./", mock=True)
+    paths = [tmp_path / f"{dir_}/1.0.manifest.json" for dir_ in range(3) for _ in range(16)]
+    for path in paths:
+        path.parent.mkdir(exist_ok=True)
+
+    def _save(path):
+        helpers.ObjectStorage.dump(api_data, path)
+
+    # every save of a directory writes the same new objects at the same time
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(_save, paths))
+    assert helpers.ObjectStorage.load(paths[0]) == api_data
+    assert not list(tmp_path.rglob("*.tmp"))
@@ -0,0 +1,24 @@
+"""Tests for apix.journal."""
+from apix.journal import CrawlJournal
+
+LINKS = [("one", "apidoc/v2/one.html"), ("two", "apidoc/v2/two.html")]
+
+
+def test_positive_resume(tmp_path):
+    journal = CrawlJournal(tmp_path / "1.0.journal")
+    journal.start(LINKS)
+    journal.record(LINKS[0], ["scraped", "one"])
+    journal.close()
+    # simulate the crawl dying in the middle of writing an entry
+    with journal.path.open("a") as partial:
+        partial.write('{"link": ["two", "apidoc/v2/tw')
+    links, results = CrawlJournal(journal.path).resume()
+    assert links == LINKS
+    assert results == {"apidoc/v2/one.html": ["scraped", "one"]}
+
+
+def test_positive_remove(tmp_path):
+    journal = CrawlJournal(tmp_path / "1.0.journal")
+    journal.start(LINKS)
+    journal.remove()
+    assert not journal.path.exists()
@@ -0,0 +1,47 @@
+"""Tests for apix.params."""
+from apix import helpers
+from apix.diff import VersionDiff
+from apix.params import Param, parse_params
+
+
+def test_positive_parse_param():
+    param = Param.parse("param1  ~ required ~ string from 2 to 128 characters")
+    assert (param.name, param.status, param.validator) == (
+        "param1",
+        "required",
+        "string from 2 to 128 characters",
+    )
+    assert param == "param1  ~ required ~ string from 2 to 128 characters"
+    assert "required" in param
+    assert Param.parse(param) is param
+    # the same fields are shared between every param that has them
+    assert Param.parse("param2 ~ required ~ String").status is param.status
+
+
+def test_positive_parse_malformed_param():
+    param = Param.parse("param1 ~ optional")
+    assert (param.name, param.status, param.validator) == ("param1", "optional", None)
+    assert str(param) == "param1 ~ optional"
+
+
+def test_positive_parse_params():
+    entity = {"methods": [{"create": {"parameters": ["id ~ required ~ integer"], "paths": []}}]}
+    parsed = parse_params(entity)["methods"][0]["create"]["parameters"][0]
+    assert isinstance(parsed, Param)
+    assert parsed.name == "id"
+
+
+def test_positive_params_saved_as_strings(tmp_path):
+    a_path = tmp_path / "2.1.yaml"
+    api_data = helpers.load_api("test123", "2.1", "./", mock=True)
+    assert isinstance(api_data["entity_one"]["methods"][0]["create"]["parameters"][0], Param)
+    helpers.YAMLStorage.dump(api_data, a_path)
+    assert helpers.YAMLStorage.load(a_path) == helpers.YAMLStorage.load(
+        helpers.api_paths("test123", "2.1", "./", mock=True)["yaml"]
+    )
+
+
+def test_positive_diff_emits_strings():
+    vdiff = VersionDiff("test123", "2.1", "1.3", "./", mock=True)
+    vdiff.diff()
+    assert "Param" not in repr(vdiff._vdiff)
@@ -0,0 +1,38 @@
+"""Tests for apix.progress."""
+import io
+
+from rich.console import Console
+from rich.progress import Progress
+
+from apix.progress import CrawlStats
+
+
+def test_positive_crawl_stats():
+    stats = CrawlStats()
+    stats.start_crawl(3)
+    stats.response(0.05, 100)
+    stats.response(0.3, 50)
+    stats.response(120)
+    stats.link_finished()
+    stats.link_finished(failed=True)
+    stats.add_time("scrape", 0.5)
+    stats.add_time("scrape", 0.25)
+    summary = stats.summary()
+    assert summary["links"] == {"total": 3, "done": 1, "failed": 1}
+    assert [summary["requests"], summary["bytes"]] == [3, 150]
+    histogram = summary["latency_histogram"]
+    assert [histogram["<=0.1s"], histogram["<=0.5s"], histogram[">60s"]] == [1, 1, 1]
+    assert sum(histogram.values()) == summary["requests"]
+    assert summary["phases"] == {"scrape": 0.75}
+
+
+def test_positive_crawl_stats_display():
+    display = Progress(console=Console(file=io.StringIO()))
+    stats = CrawlStats(display, "test 1.0")
+    stats.start_crawl(2)
+    stats.response(0.1, 2048)
+    stats.link_finished()
+    task = display.tasks[0]
+    assert [task.description, task.completed, task.total] == ["test 1.0", 1, 2]
+    assert [task.fields["pending"], task.fields["failed"]] == [1, 0]
+    assert "req/s" in task.fields["rate"]